@@ -184,8 +184,7 @@ def list_underwritings():
     """List all underwritings with merchant details, owners, and addresses."""
     try:
         conn = get_db_connection()
-        repo = UnderwritingRepository()
-        repo.__init__(conn)
+        repo = UnderwritingRepository(conn)
 
         # Use repository method
         underwritings = repo.list_all_underwritings()
@@ -203,8 +202,7 @@ def get_underwriting(underwriting_id: str):
     """Get a single underwriting with complete details. Returns 404 if not found."""
     try:
         conn = get_db_connection()
-        repo = UnderwritingRepository()
-        repo.__init__(conn)
+        repo = UnderwritingRepository(conn)
 
         # Use repository method
         underwriting = repo.get_underwriting_with_details(underwriting_id)
@@ -126,6 +126,8 @@ CREATE TABLE underwriting (
     merchant_entity_type TEXT,
     merchant_incorporation_date DATE,
     merchant_state_of_incorporation TEXT,
+    -- Optimistic concurrency: bumped on every application form save
+    row_version INT NOT NULL DEFAULT 0,
     created_at TIMESTAMP NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
     created_by UUID NOT NULL REFERENCES account(id),
@@ -163,6 +165,8 @@ CREATE TABLE owner (
     enabled BOOLEAN NOT NULL DEFAULT TRUE,
     ownership_percent NUMERIC(5,2),
     primary_owner BOOLEAN DEFAULT FALSE,
+    -- Optimistic concurrency: bumped on every owner update and soft delete
+    row_version INT NOT NULL DEFAULT 0,
     created_at TIMESTAMP NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
     created_by UUID NOT NULL REFERENCES account(id),
@@ -479,11 +483,19 @@ CREATE INDEX idx_document_status ON document(status);
 CREATE INDEX idx_execution_underwriting ON processor_executions(underwriting_id);
 CREATE INDEX idx_execution_processor ON processor_executions(processor);
 CREATE INDEX idx_execution_status ON processor_executions(status);
+CREATE INDEX idx_execution_underwriting_processor ON processor_executions(underwriting_id, processor);
 
 -- Factor indexes
 CREATE INDEX idx_factor_underwriting ON factor(underwriting_id);
 CREATE INDEX idx_factor_key ON factor(factor_key);
 CREATE INDEX idx_factor_status ON factor(status);
+CREATE INDEX idx_factor_active ON factor(underwriting_id, underwriting_processor_id) WHERE status = 'active';
+
+-- Owner indexes (partial; matches the enabled-owner lookups and their
+-- ORDER BY primary_owner DESC, first_name so rows come back pre-sorted)
+CREATE INDEX idx_owner_uw_enabled ON owner(underwriting_id, primary_owner DESC, first_name) WHERE enabled = true;
+CREATE INDEX idx_owner_address_owner ON owner_address(owner_id);
+CREATE INDEX idx_merchant_address_uw ON merchant_address(underwriting_id);
 
 -- Account indexes
 CREATE INDEX idx_account_organization ON account(organization_id);
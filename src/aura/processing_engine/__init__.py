@@ -23,6 +23,7 @@ from .exceptions import (
     ApiError,
     ResultValidationError,
     PersistenceError,
+    ConcurrentUpdateError,
     ConfigurationError,
 )
 from .models import (
@@ -60,6 +61,7 @@ __all__ = [
     "ApiError",
     "ResultValidationError",
     "PersistenceError",
+    "ConcurrentUpdateError",
     "ConfigurationError",
     # Models
     "ProcessingResult",
@@ -158,6 +158,10 @@ class BaseProcessor(ABC):
 
         Default behavior: Return the first execution's factors, or empty dict if none.
 
+        The consolidation service only calls this when at least one execution
+        produced factors; when every execution's factors are empty the
+        processor consolidates to {} without being called.
+
         Args:
             factors_list: List of factors dictionaries from executions
 
@@ -149,6 +149,18 @@ class PersistenceError(ProcessorException):
     pass
 
 
+class ConcurrentUpdateError(PersistenceError):
+    """
+    Raised when a row changed between being read and being written.
+
+    Examples:
+    - Underwriting row_version no longer matches the expected version
+    - Owner row_version no longer matches the version sent with the owner
+    """
+
+    pass
+
+
 # Configuration Exceptions
 
 
@@ -135,12 +135,14 @@ class ProcessorConfig:
         return self.config[key]
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecutionPayload:
     """
     Input payload for processor execution.
 
-    Contains all data needed to run a processor.
+    Contains all data needed to run a processor. One is built per execution,
+    so the class uses __slots__ for smaller instances and faster attribute
+    access; every attribute must be declared as a field.
     """
 
     # Identification
@@ -162,6 +164,10 @@ class ExecutionPayload:
     # Optional: specific document revisions for rerun
     revision_ids: list[str] | None = None
 
+    # Optional: the single document revision a document processor runs on
+    # (not part of to_dict, so it does not affect payload hashes)
+    revision_id: str | None = None
+
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary for hashing"""
         return {
@@ -8,10 +8,50 @@ Handles database operations for processor executions:
 - Store execution outputs
 """
 
-from typing import Any, Optional
-from datetime import datetime, date
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+from datetime import datetime, date, timezone
 from decimal import Decimal
-import json
+import logging
+import threading
+import uuid
+
+import orjson
+from cachetools import TTLCache
+from psycopg2.extras import Json, RealDictCursor
+
+logger = logging.getLogger(__name__)
+
+_UTC = timezone.utc
+_now = datetime.now
+
+# Rows fetched per network round trip by server-side (named) cursors
+_STREAM_ITERSIZE = 500
+
+# Short-lived cache for payload-hash deduplication probes, mapping
+# (underwriting_processor_id, payload_hash) to the latest execution id. Only
+# hits are cached, and only the id, which never changes; a miss always goes
+# to the database so another process's new execution is seen. The reverse
+# map lets status changes and deactivation drop their entries.
+_EXECUTION_HASH_CACHE: TTLCache = TTLCache(maxsize=4096, ttl=60)
+_EXECUTION_HASH_KEYS: TTLCache = TTLCache(maxsize=4096, ttl=60)
+_EXECUTION_HASH_CACHE_LOCK = threading.Lock()
+
+
+def _cache_execution_id(cache_key: tuple[str, str], execution_id: str) -> None:
+    """Remember the execution id found for (underwriting_processor_id, hash)."""
+    with _EXECUTION_HASH_CACHE_LOCK:
+        _EXECUTION_HASH_CACHE[cache_key] = execution_id
+        _EXECUTION_HASH_KEYS[execution_id] = cache_key
+
+
+def _invalidate_execution_ids(execution_ids: list[str]) -> None:
+    """Drop cached hash lookups that resolve to any of execution_ids."""
+    with _EXECUTION_HASH_CACHE_LOCK:
+        for execution_id in execution_ids:
+            cache_key = _EXECUTION_HASH_KEYS.pop(str(execution_id), None)
+            if cache_key is not None:
+                _EXECUTION_HASH_CACHE.pop(cache_key, None)
 
 
 def _json_serial(obj):
@@ -25,6 +65,13 @@ def _json_serial(obj):
     raise TypeError(f"Type {type(obj)} not serializable")
 
 
+def _dumps(obj: Any) -> str:
+    """Serialize for psycopg2's Json adapter; datetime and date are native."""
+    return orjson.dumps(
+        obj, default=_json_serial, option=orjson.OPT_NON_STR_KEYS
+    ).decode()
+
+
 class ExecutionRepository:
     """
     Repository for processor execution database operations.
@@ -39,7 +86,7 @@ class ExecutionRepository:
     _instance = None
     _db_connection = None
 
-    def __new__(cls):
+    def __new__(cls, db_connection: Any = None):
         if cls._instance is None:
             cls._instance = super(ExecutionRepository, cls).__new__(cls)
         return cls._instance
@@ -55,6 +102,56 @@ class ExecutionRepository:
             self._db_connection = db_connection
         self.db = self._db_connection
 
+    @classmethod
+    def bound(cls, db_connection: Any) -> "ExecutionRepository":
+        """
+        Create a repository tied to db_connection, outside the singleton.
+
+        For connections borrowed for a single call (e.g. from the pool): the
+        shared instance, and the connection other callers use through it,
+        are left untouched.
+
+        Args:
+            db_connection: Database connection or session (PostgreSQL/BigQuery)
+
+        Returns:
+            Repository instance that is not the process-wide singleton
+        """
+        # Bypass the singleton __new__, but initialize as usual; __init__
+        # stores the connection on the instance, not the class
+        repository = object.__new__(cls)
+        repository.__init__(db_connection)
+        return repository
+
+    # =========================================================================
+    # TRANSACTIONS
+    # =========================================================================
+
+    @contextmanager
+    def transaction(self) -> Iterator[Any]:
+        """
+        Run several statements on one cursor under a single commit.
+
+        Commits when the block exits normally and rolls back if it raises.
+
+        Example:
+            with execution_repo.transaction() as cursor:
+                execution_repo._update_execution_status(cursor, ...)
+                execution_repo._save_execution_result(cursor, ...)
+
+        Yields:
+            Database cursor shared by every statement in the block
+        """
+        cursor = self.db.cursor()
+        try:
+            yield cursor
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            cursor.close()
+
     # =========================================================================
     # EXECUTION CREATION
     # =========================================================================
@@ -106,33 +203,33 @@ class ExecutionRepository:
         )
         """
 
-        now = datetime.utcnow()
+        now = _now(_UTC)
 
         try:
-            cursor = self.db.cursor()
-            cursor.execute(
-                query,
-                (
-                    execution_id,
-                    organization_id,
-                    underwriting_id,
-                    underwriting_processor_id,
-                    processor_name,
-                    "pending",
-                    True,
-                    json.dumps(payload, default=_json_serial),
-                    payload_hash,
-                    now,
-                    now,
-                ),
-            )
-            self.db.commit()
-            cursor.close()
-        except Exception as e:
-            print(f"Error creating execution: {e}")
-            self.db.rollback()
+            with self.transaction() as cursor:
+                cursor.execute(
+                    query,
+                    (
+                        execution_id,
+                        organization_id,
+                        underwriting_id,
+                        underwriting_processor_id,
+                        processor_name,
+                        "pending",
+                        True,
+                        Json(payload, dumps=_dumps),
+                        payload_hash,
+                        now,
+                        now,
+                    ),
+                )
+        except Exception:
+            logger.exception("Error creating execution")
             raise
 
+        with _EXECUTION_HASH_CACHE_LOCK:
+            _EXECUTION_HASH_CACHE.pop((underwriting_processor_id, payload_hash), None)
+
         return execution_id
 
     def find_execution_by_hash(
@@ -179,11 +276,90 @@ class ExecutionRepository:
             cursor.execute(query, (underwriting_processor_id, payload_hash))
             result = cursor.fetchone()
             cursor.close()
-            return dict(result) if result else None
-        except Exception as e:
-            print(f"Error finding execution by hash: {e}")
+        except Exception:
+            logger.exception("Error finding execution by hash")
             return None
 
+        return dict(result) if result else None
+
+    def find_execution_id_by_hash(
+        self, underwriting_processor_id: str, payload_hash: str
+    ) -> Optional[str]:
+        """
+        Find the id of the latest execution with a payload hash.
+
+        Deduplication probe for callers that only need the id. Hits are
+        cached for a short TTL; misses always query the database.
+
+        Args:
+            underwriting_processor_id: Underwriting processor UUID
+            payload_hash: Hash of the payload
+
+        Returns:
+            Execution ID or None if not found
+        """
+        return self.find_execution_ids_by_hashes(
+            underwriting_processor_id, [payload_hash]
+        ).get(payload_hash)
+
+    def find_execution_ids_by_hashes(
+        self, underwriting_processor_id: str, payload_hashes: list[str]
+    ) -> dict[str, str]:
+        """
+        Find the id of the latest execution for each of several payload hashes.
+
+        Hashes not already in the short-TTL cache are resolved with a single
+        query; the ids found are cached, misses are not.
+
+        Args:
+            underwriting_processor_id: Underwriting processor UUID
+            payload_hashes: Payload hashes to look up
+
+        Returns:
+            Mapping of payload_hash to its latest execution ID; hashes with no
+            execution are absent
+        """
+        found: dict[str, str] = {}
+        missing: list[str] = []
+        with _EXECUTION_HASH_CACHE_LOCK:
+            for payload_hash in dict.fromkeys(payload_hashes):
+                execution_id = _EXECUTION_HASH_CACHE.get(
+                    (underwriting_processor_id, payload_hash)
+                )
+                if execution_id is not None:
+                    found[payload_hash] = execution_id
+                else:
+                    missing.append(payload_hash)
+
+        if not missing:
+            return found
+
+        query = """
+        SELECT DISTINCT ON (payload_hash)
+            payload_hash,
+            id
+        FROM processor_executions
+        WHERE underwriting_processor_id = %s
+          AND payload_hash = ANY(%s)
+        ORDER BY payload_hash, created_at DESC
+        """
+        try:
+            cursor = self.db.cursor()
+            cursor.execute(query, (underwriting_processor_id, missing))
+            results = cursor.fetchall()
+            cursor.close()
+        except Exception:
+            logger.exception("Error finding executions by hashes")
+            return found
+
+        for row in results:
+            execution_id = str(row["id"])
+            found[row["payload_hash"]] = execution_id
+            _cache_execution_id(
+                (underwriting_processor_id, row["payload_hash"]), execution_id
+            )
+        return found
+
     # =========================================================================
     # EXECUTION STATUS UPDATES
     # =========================================================================
@@ -211,43 +387,61 @@ class ExecutionRepository:
         Returns:
             True if update successful
         """
-        fields = ["status = %s", "updated_at = %s"]
-        params = [status, datetime.utcnow()]
-
-        if started_at:
-            fields.append("started_at = %s")
-            params.append(started_at)
-
-        if completed_at:
-            fields.append("completed_at = %s")
-            params.append(completed_at)
-
-        if failed_code:
-            fields.append("failed_code = %s")
-            params.append(failed_code)
-
-        if failed_reason:
-            fields.append("failed_reason = %s")
-            params.append(failed_reason)
+        try:
+            with self.transaction() as cursor:
+                self._update_execution_status(
+                    cursor,
+                    execution_id=execution_id,
+                    status=status,
+                    started_at=started_at,
+                    completed_at=completed_at,
+                    failed_code=failed_code,
+                    failed_reason=failed_reason,
+                )
+            return True
+        except Exception:
+            logger.exception("Error updating execution status")
+            return False
 
-        params.append(execution_id)
+    def _update_execution_status(
+        self,
+        cursor: Any,
+        execution_id: str,
+        status: str,
+        started_at: Optional[datetime] = None,
+        completed_at: Optional[datetime] = None,
+        failed_code: Optional[str] = None,
+        failed_reason: Optional[str] = None,
+    ) -> None:
+        """Execute the status UPDATE on the given cursor without committing."""
+        _invalidate_execution_ids([execution_id])
 
-        query = f"""
+        # Fixed statement text: unset fields keep their current value via
+        # COALESCE so PostgreSQL sees a single query shape for every call
+        query = """
         UPDATE processor_executions
-        SET {', '.join(fields)}
+        SET
+            status = %s,
+            updated_at = %s,
+            started_at = COALESCE(%s, started_at),
+            completed_at = COALESCE(%s, completed_at),
+            failed_code = COALESCE(%s, failed_code),
+            failed_reason = COALESCE(%s, failed_reason)
         WHERE id = %s
         """
 
-        try:
-            cursor = self.db.cursor()
-            cursor.execute(query, params)
-            self.db.commit()
-            cursor.close()
-            return True
-        except Exception as e:
-            print(f"Error updating execution status: {e}")
-            self.db.rollback()
-            return False
+        cursor.execute(
+            query,
+            (
+                status,
+                _now(_UTC),
+                started_at,
+                completed_at,
+                failed_code,
+                failed_reason,
+                execution_id,
+            ),
+        )
 
     def save_execution_result(
         self,
@@ -256,20 +450,53 @@ class ExecutionRepository:
         factors: Optional[dict[str, Any]],
         cost_cents: int,
         completed_at: datetime,
+        started_at: Optional[datetime] = None,
     ) -> bool:
         """
         Save the execution result (output, factors, cost).
 
+        Marks the execution completed in the same UPDATE, so callers need no
+        separate status write.
+
         Args:
             execution_id: Execution UUID
             output: Processor execution output (stored in factors_delta for now)
             factors: Additional factors (merged with output)
             cost_cents: Cost in cents
             completed_at: Completion timestamp
+            started_at: When execution started, for callers that skipped the
+                'running' status update (left unchanged when omitted)
 
         Returns:
             True if save successful
         """
+        try:
+            with self.transaction() as cursor:
+                self._save_execution_result(
+                    cursor,
+                    execution_id=execution_id,
+                    output=output,
+                    factors=factors,
+                    cost_cents=cost_cents,
+                    completed_at=completed_at,
+                    started_at=started_at,
+                )
+            return True
+        except Exception:
+            logger.exception("Error saving execution result")
+            return False
+
+    def _save_execution_result(
+        self,
+        cursor: Any,
+        execution_id: str,
+        output: dict[str, Any],
+        factors: Optional[dict[str, Any]],
+        cost_cents: int,
+        completed_at: datetime,
+        started_at: Optional[datetime] = None,
+    ) -> None:
+        """Execute the result UPDATE on the given cursor without committing."""
         # Merge output and factors (output takes precedence)
         # Store in factors_delta column since there's no output column
         combined_factors = {**(factors or {}), **output}
@@ -280,36 +507,23 @@ class ExecutionRepository:
             status = 'completed',
             factors_delta = %s,
             run_cost_cents = %s,
+            started_at = COALESCE(%s, started_at),
             completed_at = %s,
             updated_at = %s
         WHERE id = %s
         """
 
-        now = datetime.utcnow()
-
-        try:
-            cursor = self.db.cursor()
-            cursor.execute(
-                query,
-                (
-                    (
-                        json.dumps(combined_factors, default=_json_serial)
-                        if combined_factors
-                        else None
-                    ),
-                    cost_cents,
-                    completed_at,
-                    now,
-                    execution_id,
-                ),
-            )
-            self.db.commit()
-            cursor.close()
-            return True
-        except Exception as e:
-            print(f"Error saving execution result: {e}")
-            self.db.rollback()
-            return False
+        cursor.execute(
+            query,
+            (
+                Json(combined_factors, dumps=_dumps) if combined_factors else None,
+                cost_cents,
+                started_at,
+                completed_at,
+                _now(_UTC),
+                execution_id,
+            ),
+        )
 
     # =========================================================================
     # EXECUTION RETRIEVAL
@@ -349,17 +563,68 @@ class ExecutionRepository:
         WHERE id = %s
         """
         try:
-            from psycopg2.extras import RealDictCursor
-
             cursor = self.db.cursor(cursor_factory=RealDictCursor)
             cursor.execute(query, (execution_id,))
             result = cursor.fetchone()
             cursor.close()
             return dict(result) if result else None
-        except Exception as e:
-            print(f"Error fetching execution by id: {e}")
+        except Exception:
+            logger.exception("Error fetching execution by id")
             return None
 
+    def get_executions_by_ids(
+        self, execution_ids: list[str]
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Get several execution records in a single query.
+
+        Batch counterpart of get_execution_by_id for callers dispatching a
+        list of executions.
+
+        Args:
+            execution_ids: Execution UUIDs
+
+        Returns:
+            Mapping of execution_id to execution record; IDs that do not
+            exist are absent
+        """
+        if not execution_ids:
+            return {}
+
+        query = """
+        SELECT
+            id,
+            organization_id,
+            underwriting_id,
+            underwriting_processor_id,
+            processor,
+            status,
+            enabled,
+            payload,
+            payload_hash,
+            factors_delta,
+            run_cost_cents,
+            started_at,
+            completed_at,
+            failed_code,
+            failed_reason,
+            updated_execution_id,
+            created_at,
+            updated_at
+        FROM processor_executions
+        WHERE id = ANY(%s::uuid[])
+        """
+        try:
+            cursor = self.db.cursor(cursor_factory=RealDictCursor)
+            cursor.execute(query, (list(execution_ids),))
+            results = cursor.fetchall()
+            cursor.close()
+        except Exception:
+            logger.exception("Error fetching executions by ids")
+            return {}
+
+        return {str(row["id"]): dict(row) for row in results}
+
     def get_active_executions(
         self, underwriting_processor_id: str
     ) -> list[dict[str, Any]]:
@@ -413,10 +678,73 @@ class ExecutionRepository:
             # Results are already dictionaries (RealDictRow objects)
             cursor.close()
             return [dict(row) for row in results]
-        except Exception as e:
-            print(f"Error fetching active executions: {e}")
+        except Exception:
+            logger.exception("Error fetching active executions")
             return []
 
+    def get_active_executions_for_processors(
+        self, underwriting_processor_ids: list[str]
+    ) -> dict[str, list[dict[str, Any]]]:
+        """
+        Get active executions for several processors in a single query.
+
+        Batch counterpart of get_active_executions for callers iterating over
+        an underwriting's processors.
+
+        Args:
+            underwriting_processor_ids: Underwriting processor UUIDs
+
+        Returns:
+            Mapping of underwriting_processor_id to its active execution records
+            (every requested ID is present, with an empty list if none)
+        """
+        executions_by_processor: dict[str, list[dict[str, Any]]] = {
+            underwriting_processor_id: []
+            for underwriting_processor_id in underwriting_processor_ids
+        }
+        if not underwriting_processor_ids:
+            return executions_by_processor
+
+        query = """
+        SELECT
+            pe.id,
+            pe.organization_id,
+            pe.underwriting_id,
+            pe.underwriting_processor_id,
+            pe.processor,
+            pe.status,
+            pe.enabled,
+            pe.payload,
+            pe.payload_hash,
+            pe.factors_delta,
+            pe.run_cost_cents,
+            pe.completed_at,
+            pe.created_at
+        FROM processor_executions pe
+        INNER JOIN underwriting_processors up
+            ON pe.underwriting_processor_id = up.id
+        WHERE pe.underwriting_processor_id = ANY(%s::uuid[])
+          AND pe.enabled = true
+          AND pe.status IN ('completed', 'failed')
+          AND pe.id = ANY(up.current_executions_list)
+        ORDER BY pe.completed_at DESC
+        """
+        try:
+            cursor = self.db.cursor()
+            cursor.execute(query, (list(underwriting_processor_ids),))
+            results = cursor.fetchall()
+            cursor.close()
+        except Exception:
+            logger.exception("Error fetching active executions for processors")
+            return executions_by_processor
+
+        for row in results:
+            executions_by_processor.setdefault(
+                str(row["underwriting_processor_id"]), []
+            ).append(dict(row))
+
+        return executions_by_processor
+
     def get_executions_by_underwriting(
         self,
         underwriting_id: str,
@@ -467,13 +795,19 @@ class ExecutionRepository:
         query += " ORDER BY created_at DESC"
 
         try:
-            cursor = self.db.cursor()
+            # Server-side cursor streams rows in batches of _STREAM_ITERSIZE
+            # instead of materializing the whole result set client-side
+            cursor = self.db.cursor(
+                name=f"executions_by_underwriting_{uuid.uuid4().hex}",
+                cursor_factory=RealDictCursor,
+            )
+            cursor.itersize = _STREAM_ITERSIZE
             cursor.execute(query, params)
-            results = cursor.fetchall()
+            executions = [dict(row) for row in cursor]
             cursor.close()
-            return [dict(row) for row in results] if results else []
-        except Exception as e:
-            print(f"Error fetching executions by underwriting: {e}")
+            return executions
+        except Exception:
+            logger.exception("Error fetching executions by underwriting")
             return []
 
     # =========================================================================
@@ -503,15 +837,11 @@ class ExecutionRepository:
         WHERE id = %s
         """
         try:
-            cursor = self.db.cursor()
-            cursor.execute(
-                query, (new_execution_id, datetime.utcnow(), old_execution_id)
-            )
-            self.db.commit()
-            cursor.close()
+            with self.transaction() as cursor:
+                cursor.execute(query, (new_execution_id, _now(_UTC), old_execution_id))
             return True
-        except Exception as e:
-            self.db.rollback()
+        except Exception:
+            logger.exception("Error marking execution superseded")
             return False
 
     def get_execution_chain(self, execution_id: str) -> list[dict[str, Any]]:
@@ -580,15 +910,16 @@ class ExecutionRepository:
             WHERE id = ANY(%s::uuid[])
             """
 
-            now = datetime.utcnow()
+            now = _now(_UTC)
 
+            _invalidate_execution_ids(execution_list)
             cursor.execute(query, (now, now, execution_list))
 
             self.db.commit()
             return True
 
-        except Exception as e:
-            print(f"Error deactivating executions: {e}")
+        except Exception:
+            logger.exception("Error deactivating executions")
             if self.db:
                 self.db.rollback()
             return False
@@ -604,25 +935,75 @@ class ExecutionRepository:
 
     def _generate_uuid(self) -> str:
         """Generate a UUID for new records."""
-        import uuid
-
         return str(uuid.uuid4())
 
     def get_execution_count(
-        self, underwriting_id: str, processor_name: Optional[str] = None
+        self,
+        underwriting_id: str,
+        processor_name: Optional[str] = None,
+        fast_estimate: bool = False,
     ) -> int:
         """
         Get count of executions for an underwriting.
 
+        Exact counts are served by idx_execution_underwriting_processor.
+        With fast_estimate, the planner's row estimate is returned instead,
+        which avoids scanning matching rows (suitable for pagination hints).
+
         Args:
             underwriting_id: Underwriting UUID
             processor_name: Optional filter by processor
+            fast_estimate: If True, return the planner's estimated row count
 
         Returns:
             Count of executions
         """
+        where = "WHERE underwriting_id = %s"
+        params = [underwriting_id]
+
+        if processor_name:
+            where += " AND processor = %s"
+            params.append(processor_name)
+
+        if fast_estimate:
+            query = f"EXPLAIN (FORMAT JSON) SELECT 1 FROM processor_executions {where}"
+        else:
+            query = f"SELECT COUNT(*) AS count FROM processor_executions {where}"
+
+        try:
+            cursor = self.db.cursor()
+            cursor.execute(query, params)
+            result = cursor.fetchone()
+            cursor.close()
+        except Exception:
+            logger.exception("Error counting executions")
+            return 0
+
+        if not result:
+            return 0
+
+        if fast_estimate:
+            return int(result["QUERY PLAN"][0]["Plan"]["Plan Rows"])
+
+        return result["count"]
+
+    def has_any_execution(
+        self, underwriting_id: str, processor_name: Optional[str] = None
+    ) -> bool:
+        """
+        Check whether an underwriting has at least one execution.
+
+        Stops at the first matching row instead of counting all of them.
+
+        Args:
+            underwriting_id: Underwriting UUID
+            processor_name: Optional filter by processor
+
+        Returns:
+            True if any execution exists
+        """
         query = """
-        SELECT COUNT(*) as count
+        SELECT 1
         FROM processor_executions
         WHERE underwriting_id = %s
         """
@@ -633,7 +1014,14 @@ class ExecutionRepository:
             query += " AND processor = %s"
             params.append(processor_name)
 
-        # TODO: Execute query with db connection
-        # result = self.db.execute(query, params).fetchone()
-        # return result['count'] if result else 0
-        return 0
\ No newline at end of file
+        query += " LIMIT 1"
+
+        try:
+            cursor = self.db.cursor()
+            cursor.execute(query, params)
+            result = cursor.fetchone()
+            cursor.close()
+            return result is not None
+        except Exception:
+            logger.exception("Error checking for executions")
+            return False
@@ -4,19 +4,74 @@ Factor Repository
 Handles factor storage and retrieval operations for the AURA underwriting system.
 """
 
-import json
-from datetime import datetime
-from typing import Any, Optional
-from psycopg2.extras import Json
+import hashlib
+import logging
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Iterator, Optional
+
+import orjson
+from psycopg2.extras import RealDictCursor, execute_values
+
+logger = logging.getLogger(__name__)
+
+_UTC = timezone.utc
+_now = datetime.now
+
+# Rows fetched per network round trip by server-side (named) cursors
+_STREAM_ITERSIZE = 500
+
+# Column order shared by the save_factors and save_factors_bulk INSERTs
+_FACTOR_INSERT_COLUMNS = (
+    "organization_id",
+    "underwriting_id",
+    "factor_key",
+    "value",
+    "source",
+    "status",
+    "factor_hash",
+    "underwriting_processor_id",
+    "execution_id",
+    "created_by",
+    "created_at",
+    "updated_at",
+)
+_FACTOR_INSERT_COLUMNS_SQL = ", ".join(_FACTOR_INSERT_COLUMNS)
 
 
 def _json_serial(obj):
     """JSON serializer for objects not serializable by default."""
     if isinstance(obj, datetime):
         return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
     raise TypeError(f"Type {type(obj)} not serializable")
 
 
+def _encode_factor(factor_key: str, factor_value: Any) -> tuple[str, str]:
+    """
+    Serialize a factor value once for both storage and deduplication.
+
+    The value is encoded as canonical (sorted-key) JSON, which is bound to
+    the jsonb column as text, and hashed together with the factor key into a
+    16-byte BLAKE2b digest (32 hex characters).
+
+    Returns:
+        Tuple of (JSON text, factor hash)
+    """
+    value_bytes = orjson.dumps(
+        factor_value,
+        default=_json_serial,
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+    )
+    digest = hashlib.blake2b(factor_key.encode(), digest_size=16)
+    digest.update(b"\x00")
+    digest.update(value_bytes)
+    return value_bytes.decode(), digest.hexdigest()
+
+
 class FactorRepository:
     """
     Repository for factor database operations.
@@ -27,14 +82,6 @@ class FactorRepository:
     - Factor snapshots for audit trails
     """
 
-    _instance = None
-    _db_connection = None
-
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(FactorRepository, cls).__new__(cls)
-        return cls._instance
-
     def __init__(self, db_connection: Any = None):
         """
         Initialize the repository with a database connection.
@@ -42,15 +89,32 @@ class FactorRepository:
         Args:
             db_connection: Database connection or session (PostgreSQL/BigQuery)
         """
-        if db_connection is not None:
-            self._db_connection = db_connection
-        self.db = self._db_connection
+        self.db = db_connection
+
+    @contextmanager
+    def transaction(self) -> Iterator[Any]:
+        """
+        Run several factor writes on one cursor under a single commit.
 
-    def _generate_uuid(self) -> str:
-        """Generate a UUID string."""
-        import uuid
+        Commits when the block exits normally and rolls back if it raises.
 
-        return str(uuid.uuid4())
+        Example:
+            with factor_repo.transaction() as cursor:
+                factor_repo.save_factors(..., cursor=cursor)
+                factor_repo.save_factors(..., cursor=cursor)
+
+        Yields:
+            Database cursor shared by every statement in the block
+        """
+        cursor = self.db.cursor()
+        try:
+            yield cursor
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            cursor.close()
 
     def save_factors(
         self,
@@ -61,6 +125,7 @@ class FactorRepository:
         factors: dict[str, Any],
         source: str = "processor",
         created_by: Optional[str] = None,
+        cursor: Optional[Any] = None,
     ) -> bool:
         """
         Save consolidated factors to the factor table.
@@ -73,126 +138,236 @@ class FactorRepository:
             factors: Dictionary of factor_key -> factor_value
             source: Factor source ('processor' or 'manual')
             created_by: User who created the factors
+            cursor: Cursor from transaction(); when given, the caller owns the
+                commit and errors are raised instead of returning False
 
         Returns:
             True if save successful
         """
-        try:
-            cursor = self.db.cursor()
-            now = datetime.utcnow()
+        if cursor is None:
+            try:
+                with self.transaction() as cursor:
+                    return self.save_factors(
+                        organization_id,
+                        underwriting_id,
+                        underwriting_processor_id,
+                        execution_id,
+                        factors,
+                        source=source,
+                        created_by=created_by,
+                        cursor=cursor,
+                    )
+            except Exception:
+                logger.exception("Error saving factors")
+                return False
 
-            # Process each factor with UPSERT logic
-            for factor_key, factor_value in factors.items():
-                print(f"    🔍 Processing factor: {factor_key} = {factor_value}")
-                if factor_value is None:  # Skip None values
-                    print(f"    ⏭️  Skipping {factor_key} - None value")
-                    continue
+        now = _now(_UTC)
 
-                # Generate factor hash for deduplication
-                factor_hash = f"{factor_key}:{json.dumps(factor_value, sort_keys=True)}"
+        # Serialize and hash each factor once, skipping None values
+        pending_factors: dict[str, tuple[str, str]] = {}
+        for factor_key, factor_value in factors.items():
+            logger.debug("Processing factor %s", factor_key)
+            if factor_value is None:  # Skip None values
+                logger.debug("Skipping factor %s: None value", factor_key)
+                continue
 
-                # Check if factor with same key and execution_id already exists
-                cursor.execute(
-                    """
-                    SELECT id, value, factor_hash
-                    FROM factor
-                    WHERE underwriting_id = %s
-                      AND factor_key = %s
-                      AND execution_id = %s
-                      AND status = 'active'
-                    """,
-                    (underwriting_id, factor_key, execution_id),
+            pending_factors[factor_key] = _encode_factor(factor_key, factor_value)
+
+        if not pending_factors:
+            return True
+
+        # Update changed factors and report which keys already exist in one
+        # statement; unchanged values are filtered out by IS DISTINCT FROM
+        incoming_rows = ", ".join(["(%s, %s::jsonb, %s)"] * len(pending_factors))
+        incoming_params = [
+            param
+            for factor_key, (value_json, factor_hash) in pending_factors.items()
+            for param in (factor_key, value_json, factor_hash)
+        ]
+        cursor.execute(
+            f"""
+            WITH incoming (factor_key, value, factor_hash) AS (
+                VALUES {incoming_rows}
+            ),
+            existing AS (
+                SELECT f.id, f.factor_key, f.factor_hash
+                FROM factor f
+                INNER JOIN incoming i ON i.factor_key = f.factor_key
+                WHERE f.underwriting_id = %s
+                  AND f.execution_id = %s
+                  AND f.status = 'active'
+            ),
+            updated AS (
+                UPDATE factor f
+                SET value = i.value,
+                    factor_hash = i.factor_hash,
+                    updated_at = %s,
+                    updated_by = %s
+                FROM existing e
+                INNER JOIN incoming i ON i.factor_key = e.factor_key
+                WHERE f.id = e.id
+                  AND e.factor_hash IS DISTINCT FROM i.factor_hash
+                RETURNING f.factor_key
+            )
+            SELECT DISTINCT e.factor_key, u.factor_key IS NOT NULL AS updated
+            FROM existing e
+            LEFT JOIN updated u ON u.factor_key = e.factor_key
+            """,
+            (*incoming_params, underwriting_id, execution_id, now, created_by),
+        )
+        existing_keys = set()
+        for row in cursor.fetchall():
+            existing_keys.add(row["factor_key"])
+            logger.debug(
+                "%s factor %s",
+                "Updated" if row["updated"] else "Skipped unchanged",
+                row["factor_key"],
+            )
+
+        # Factors that don't exist yet are inserted (id defaults in DB)
+        insert_rows = []
+        for factor_key, (value_json, factor_hash) in pending_factors.items():
+            if factor_key in existing_keys:
+                continue
+
+            logger.debug("Inserting new factor %s", factor_key)
+            insert_rows.append(
+                (
+                    organization_id,
+                    underwriting_id,
+                    factor_key,
+                    value_json,
+                    source,
+                    "active",
+                    factor_hash,
+                    underwriting_processor_id,
+                    execution_id,
+                    created_by,
+                    now,
+                    now,
                 )
-                existing_factor = cursor.fetchone()
+            )
 
-                if existing_factor:
-                    # Factor exists - check if value has changed
-                    existing_id = existing_factor["id"]
-                    existing_value = existing_factor["value"]
-                    existing_hash = existing_factor["factor_hash"]
+        if insert_rows:
+            execute_values(
+                cursor,
+                f"INSERT INTO factor ({_FACTOR_INSERT_COLUMNS_SQL}) VALUES %s",
+                insert_rows,
+                page_size=100,
+            )
 
-                    print(
-                        f"    🔍 Existing factor found: {factor_key} with ID: {existing_id}"
-                    )
+        return True
 
-                    if existing_hash == factor_hash:
-                        # Same value, no update needed
-                        print(f"    ⏭️  Skipping {factor_key} - same value")
-                        continue
-                    else:
-                        # Value changed - update existing factor
-                        print(f"    🔄 Updating {factor_key} - value changed")
-                        cursor.execute(
-                            """
-                            UPDATE factor
-                            SET value = %s,
-                                factor_hash = %s,
-                                updated_at = %s,
-                                updated_by = %s
-                            WHERE id = %s
-                            """,
-                            (
-                                Json(factor_value),
-                                factor_hash,
-                                now,
-                                created_by,
-                                existing_id,
-                            ),
-                        )
-                else:
-                    # Factor doesn't exist - insert new one
-                    factor_id = self._generate_uuid()
-                    print(f"    ➕ Inserting new factor: {factor_key}")
-
-                    cursor.execute(
-                        """
-                        INSERT INTO factor (
-                            id,
-                            organization_id,
-                            underwriting_id,
-                            factor_key,
-                            value,
-                            source,
-                            status,
-                            factor_hash,
-                            underwriting_processor_id,
-                            execution_id,
-                            created_by,
-                            created_at,
-                            updated_at
-                        ) VALUES (
-                            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                        )
-                        """,
-                        (
-                            factor_id,
-                            organization_id,
-                            underwriting_id,
-                            factor_key,
-                            Json(factor_value),
-                            source,
-                            "active",
-                            factor_hash,
-                            underwriting_processor_id,
-                            execution_id,
-                            created_by,
-                            now,
-                            now,
-                        ),
-                    )
+    def save_factors_bulk(
+        self,
+        saves: list[dict[str, Any]],
+        cursor: Optional[Any] = None,
+    ) -> set[str]:
+        """
+        Save consolidated factors for many processors in one batched upsert.
 
-            self.db.commit()
-            cursor.close()
-            return True
+        Equivalent to calling save_factors() once per entry, but every factor
+        of every entry goes through a single execute_values statement (one
+        round trip per 500 factors) instead of two statements per processor.
 
-        except Exception as e:
-            print(f"Error saving factors: {e}")
-            print(f"Exception type: {type(e)}")
-            import traceback
+        Args:
+            saves: save_factors() keyword arguments per processor:
+                organization_id, underwriting_id, underwriting_processor_id,
+                execution_id, factors, and optionally source and created_by
+            cursor: Cursor from transaction(); when omitted the batch runs in
+                its own transaction. Errors are raised in both cases
 
-            print(f"Traceback: {traceback.format_exc()}")
-            self.db.rollback()
-            return False
+        Returns:
+            underwriting_processor_ids that had factors inserted or updated
+        """
+        if cursor is None:
+            with self.transaction() as cursor:
+                return self.save_factors_bulk(saves, cursor=cursor)
+
+        now = _now(_UTC)
+
+        rows = [
+            (
+                save["organization_id"],
+                save["underwriting_id"],
+                save["underwriting_processor_id"],
+                save["execution_id"],
+                factor_key,
+                *_encode_factor(factor_key, factor_value),
+                save.get("source", "processor"),
+                save.get("created_by"),
+                now,
+            )
+            for save in saves
+            for factor_key, factor_value in save["factors"].items()
+            if factor_value is not None
+        ]
+        if not rows:
+            return set()
+
+        # Update changed factors matched on (underwriting, execution, key) and
+        # insert the rest, per page of rows; unchanged values are filtered out
+        # by IS DISTINCT FROM, as in save_factors()
+        result_rows = execute_values(
+            cursor,
+            f"""
+            WITH incoming (
+                organization_id, underwriting_id, underwriting_processor_id,
+                execution_id, factor_key, value, factor_hash, source,
+                created_by, now
+            ) AS (
+                VALUES %s
+            ),
+            existing AS (
+                SELECT f.id, f.factor_hash AS current_hash, i.*
+                FROM factor f
+                INNER JOIN incoming i
+                    ON i.underwriting_id = f.underwriting_id
+                   AND i.execution_id = f.execution_id
+                   AND i.factor_key = f.factor_key
+                WHERE f.status = 'active'
+            ),
+            updated AS (
+                UPDATE factor f
+                SET value = e.value,
+                    factor_hash = e.factor_hash,
+                    updated_at = e.now,
+                    updated_by = e.created_by
+                FROM existing e
+                WHERE f.id = e.id
+                  AND e.current_hash IS DISTINCT FROM e.factor_hash
+                RETURNING f.underwriting_processor_id
+            ),
+            inserted AS (
+                INSERT INTO factor ({_FACTOR_INSERT_COLUMNS_SQL})
+                SELECT i.organization_id, i.underwriting_id, i.factor_key,
+                       i.value, i.source, 'active', i.factor_hash,
+                       i.underwriting_processor_id, i.execution_id,
+                       i.created_by, i.now, i.now
+                FROM incoming i
+                WHERE NOT EXISTS (
+                    SELECT 1
+                    FROM existing e
+                    WHERE e.underwriting_id = i.underwriting_id
+                      AND e.execution_id = i.execution_id
+                      AND e.factor_key = i.factor_key
+                )
+                RETURNING underwriting_processor_id
+            )
+            SELECT underwriting_processor_id FROM updated
+            UNION
+            SELECT underwriting_processor_id FROM inserted
+            """,
+            rows,
+            template=(
+                "(%s::uuid, %s::uuid, %s::uuid, %s::uuid, %s, %s::jsonb, %s, "
+                "%s, %s::uuid, %s::timestamp)"
+            ),
+            page_size=500,
+            fetch=True,
+        )
+
+        return {str(row["underwriting_processor_id"]) for row in result_rows}
 
     def get_factors(
         self,
@@ -210,7 +385,12 @@ class FactorRepository:
             List of factor records
         """
         try:
-            cursor = self.db.cursor()
+            # Server-side cursor streams rows in batches of _STREAM_ITERSIZE
+            # instead of materializing the whole result set client-side
+            cursor = self.db.cursor(
+                name=f"factors_{uuid.uuid4().hex}", cursor_factory=RealDictCursor
+            )
+            cursor.itersize = _STREAM_ITERSIZE
 
             if underwriting_processor_id:
                 cursor.execute(
@@ -242,31 +422,13 @@ class FactorRepository:
                     (underwriting_id,),
                 )
 
-            results = cursor.fetchall()
+            factors = [dict(row) for row in cursor]
             cursor.close()
 
-            # Convert to list of dictionaries
-            factors = []
-            for row in results:
-                factors.append(
-                    {
-                        "id": row[0],
-                        "factor_key": row[1],
-                        "value": row[2],
-                        "unit": row[3],
-                        "source": row[4],
-                        "status": row[5],
-                        "underwriting_processor_id": row[6],
-                        "execution_id": row[7],
-                        "created_at": row[8],
-                        "updated_at": row[9],
-                    }
-                )
-
             return factors
 
-        except Exception as e:
-            print(f"Error fetching factors: {e}")
+        except Exception:
+            logger.exception("Error fetching factors")
             return []
 
     def clear_factors(
@@ -274,38 +436,112 @@ class FactorRepository:
         underwriting_id: str,
         underwriting_processor_id: str,
         updated_by: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        cursor: Optional[Any] = None,
     ) -> bool:
         """
         Clear all factors for a specific processor.
 
+        By default every active factor is soft-deleted in one statement and
+        one transaction, so a failure leaves nothing half-cleared. The lookup
+        is served by the idx_factor_active partial index.
+
         Args:
             underwriting_id: Underwriting UUID
             underwriting_processor_id: Underwriting processor UUID
             updated_by: User performing the clear
+            batch_size: Opt-in for maintenance clears of very large processors:
+                soft-delete at most batch_size rows per statement and commit
+                each batch, bounding lock duration and WAL bursts. A failure
+                leaves earlier batches cleared; rerunning finishes the job.
+                Cannot be combined with cursor
+            cursor: Cursor from transaction(); when given, the caller owns the
+                commit and errors are raised instead of returning False
 
         Returns:
             True if clear successful
+
+        Raises:
+            ValueError: If both batch_size and cursor are given
         """
+        if batch_size is not None:
+            if cursor is not None:
+                raise ValueError(
+                    "batch_size commits each batch and cannot join a transaction"
+                )
+            return self._clear_factors_in_batches(
+                underwriting_id, underwriting_processor_id, updated_by, batch_size
+            )
+
+        if cursor is None:
+            try:
+                with self.transaction() as cursor:
+                    return self.clear_factors(
+                        underwriting_id,
+                        underwriting_processor_id,
+                        updated_by=updated_by,
+                        cursor=cursor,
+                    )
+            except Exception:
+                logger.exception("Error clearing factors")
+                return False
+
+        cursor.execute(
+            """
+            UPDATE factor
+            SET status = 'deleted', updated_at = %s, updated_by = %s
+            WHERE underwriting_id = %s
+              AND underwriting_processor_id = %s
+              AND status = 'active'
+            """,
+            (_now(_UTC), updated_by, underwriting_id, underwriting_processor_id),
+        )
+        return True
+
+    def _clear_factors_in_batches(
+        self,
+        underwriting_id: str,
+        underwriting_processor_id: str,
+        updated_by: Optional[str],
+        batch_size: int,
+    ) -> bool:
+        """Soft-delete a processor's factors batch_size rows per commit."""
         try:
             cursor = self.db.cursor()
-            now = datetime.utcnow()
-
-            cursor.execute(
-                """
-                UPDATE factor
-                SET status = 'deleted', updated_at = %s, updated_by = %s
-                WHERE underwriting_id = %s
-                  AND underwriting_processor_id = %s
-                  AND status = 'active'
-                """,
-                (now, updated_by, underwriting_id, underwriting_processor_id),
-            )
+            now = _now(_UTC)
+
+            while True:
+                cursor.execute(
+                    """
+                    UPDATE factor
+                    SET status = 'deleted', updated_at = %s, updated_by = %s
+                    WHERE ctid IN (
+                        SELECT ctid
+                        FROM factor
+                        WHERE underwriting_id = %s
+                          AND underwriting_processor_id = %s
+                          AND status = 'active'
+                        LIMIT %s
+                    )
+                    """,
+                    (
+                        now,
+                        updated_by,
+                        underwriting_id,
+                        underwriting_processor_id,
+                        batch_size,
+                    ),
+                )
+                cleared = cursor.rowcount
+                self.db.commit()
+
+                if cleared < batch_size:
+                    break
 
-            self.db.commit()
             cursor.close()
             return True
 
-        except Exception as e:
-            print(f"Error clearing factors: {e}")
+        except Exception:
+            logger.exception("Error clearing factors")
             self.db.rollback()
             return False
@@ -9,8 +9,253 @@ Handles database operations for processor configuration and management:
 """
 
 from typing import Any, Optional
-from datetime import datetime
+import logging
+import os
 import re
+import threading
+import weakref
+
+import psycopg2
+from cachetools import TTLCache
+from psycopg2 import errors, extensions
+
+logger = logging.getLogger(__name__)
+
+# Transient failures are re-raised so callers can retry the whole operation;
+# that includes a prepared statement lost to a session reset mid-transaction
+# (see _execute_prepared)
+_RETRYABLE_ERRORS = (
+    errors.SerializationFailure,
+    errors.DeadlockDetected,
+    errors.InvalidSqlStatementName,
+)
+
+# Shared projection for underwriting processor lookups. Built once at import so
+# every call sends byte-identical SQL text for the same lookup shape.
+_UNDERWRITING_PROCESSOR_SELECT = """
+SELECT
+    up.id,
+    up.organization_id,
+    up.underwriting_id,
+    up.organization_processor_id,
+    up.processor,
+    up.name,
+    up.auto,
+    up.enabled,
+    up.config_override,
+    up.effective_config,
+    up.current_executions_list,
+    op.config as organization_config,
+    op.price_amount,
+    op.price_unit
+FROM underwriting_processors up
+LEFT JOIN organization_processors op ON up.organization_processor_id = op.id
+"""
+
+# Filter columns only, for callers that just iterate or filter processors
+_UNDERWRITING_PROCESSOR_SUMMARY_SELECT = """
+SELECT
+    up.id,
+    up.processor,
+    up.name,
+    up.auto,
+    up.enabled
+FROM underwriting_processors up
+"""
+
+
+def _build_underwriting_processors_queries(
+    select: str, name_prefix: str
+) -> dict[tuple[bool, bool], tuple[str, str]]:
+    """
+    Build the per-underwriting list query for every filter combination.
+
+    Args:
+        select: SELECT ... FROM clause aliasing underwriting_processors as up
+        name_prefix: Prefix for the prepared statement names
+
+    Returns:
+        (prepared statement name, SQL) keyed by (enabled_only, auto_only)
+    """
+    queries = {}
+    for enabled_only in (False, True):
+        for auto_only in (False, True):
+            conditions = ["up.underwriting_id = $1"]
+            suffix = []
+            if enabled_only:
+                conditions.append("up.enabled = true")
+                suffix.append("enabled")
+            if auto_only:
+                conditions.append("up.auto = true")
+                suffix.append("auto")
+
+            queries[(enabled_only, auto_only)] = (
+                "_".join([name_prefix, *(suffix or ["all"])]),
+                f"{select} WHERE {' AND '.join(conditions)} ORDER BY up.created_at",
+            )
+    return queries
+
+
+# Four fixed texts per projection means each filter variant is planned once per
+# connection instead of being rebuilt on every call.
+_UNDERWRITING_PROCESSORS_QUERIES = _build_underwriting_processors_queries(
+    _UNDERWRITING_PROCESSOR_SELECT, "underwriting_processors"
+)
+_UNDERWRITING_PROCESSORS_SUMMARY_QUERIES = _build_underwriting_processors_queries(
+    _UNDERWRITING_PROCESSOR_SUMMARY_SELECT, "underwriting_processors_summary"
+)
+
+# Tenant config overlaid with the underwriting override, merged server-side
+_EFFECTIVE_CONFIG_QUERY = """
+SELECT
+    COALESCE(op.config, '{}'::jsonb) || COALESCE(up.config_override, '{}'::jsonb)
+        AS effective_config
+FROM underwriting_processors up
+LEFT JOIN organization_processors op ON up.organization_processor_id = op.id
+WHERE up.id = $1
+"""
+
+_PURCHASED_PROCESSOR_SELECT = """
+SELECT
+    id,
+    organization_id,
+    processor,
+    name,
+    auto,
+    status,
+    config,
+    price_amount,
+    price_unit,
+    price_currency,
+    purchased_at,
+    purchased_by
+FROM organization_processors
+"""
+
+_PURCHASED_PROCESSOR_BY_ID_QUERY = (
+    _PURCHASED_PROCESSOR_SELECT + " WHERE id = $1 AND status != 'deleted'"
+)
+_PURCHASED_PROCESSOR_BY_NAME_QUERY = (
+    _PURCHASED_PROCESSOR_SELECT
+    + " WHERE processor = $1 AND organization_id = $2 AND status = 'active'"
+    + " LIMIT 1"
+)
+
+# Tenant processor subscriptions change rarely but are read on every stage, so
+# lookups are cached briefly. Keys are ("id", purchased_processor_id) and
+# ("name", organization_id, processor_name); misses are cached as None.
+_PURCHASED_PROCESSOR_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+_PURCHASED_PROCESSOR_CACHE_LOCK = threading.Lock()
+
+# get_purchased_processors_by_organization variants: (prepared statement
+# name, SQL) keyed by (enabled_only, auto_only)
+_PURCHASED_PROCESSORS_QUERIES: dict[tuple[bool, bool], tuple[str, str]] = {
+    (False, False): (
+        "purchased_processors_all",
+        _PURCHASED_PROCESSOR_SELECT
+        + " WHERE organization_id = $1 AND status != 'deleted'",
+    ),
+    (True, False): (
+        "purchased_processors_enabled",
+        _PURCHASED_PROCESSOR_SELECT
+        + " WHERE organization_id = $1 AND status = 'active'",
+    ),
+    (False, True): (
+        "purchased_processors_auto",
+        _PURCHASED_PROCESSOR_SELECT
+        + " WHERE organization_id = $1 AND status != 'deleted' AND auto = true",
+    ),
+    (True, True): (
+        "purchased_processors_enabled_auto",
+        _PURCHASED_PROCESSOR_SELECT
+        + " WHERE organization_id = $1 AND status = 'active' AND auto = true",
+    ),
+}
+
+# SQL-level PREPARE/EXECUTE is session state, which PgBouncer transaction
+# pooling does not preserve between transactions. With AURA_DB_POOL_MODE set to
+# "transaction" the same statements are sent as plain parameterized queries.
+_USE_PREPARED_STATEMENTS = os.getenv("AURA_DB_POOL_MODE", "session") != "transaction"
+
+_PLACEHOLDER_PATTERN = re.compile(r"\$(\d+)")
+
+# Names of server-side prepared statements already created on each connection.
+# Prepared statements live for the whole database session, so each connection
+# pays the parse/plan cost once per statement.
+_PREPARED_STATEMENTS: "weakref.WeakKeyDictionary[Any, set[str]]" = (
+    weakref.WeakKeyDictionary()
+)
+_PREPARED_STATEMENTS_LOCK = threading.Lock()
+
+
+def _execute_prepared(
+    cursor: Any,
+    name: str,
+    sql: str,
+    params: tuple,
+    param_types: Optional[tuple[str, ...]] = None,
+) -> None:
+    """
+    Execute a statement through a named server-side prepared statement.
+
+    The statement is prepared on first use per connection and executed with
+    EXECUTE afterwards. Behind a transaction-mode pooler the statement is
+    executed directly instead, with $n placeholders bound as %s.
+
+    If the session was reset server-side (e.g. DISCARD ALL), the
+    connection's statements are forgotten. With no transaction open the
+    statement is prepared again and retried once; inside one the caller's
+    work is already aborted, so InvalidSqlStatementName is raised and the
+    statement is prepared again on the next call after the rollback.
+
+    Args:
+        cursor: Open cursor
+        name: Prepared statement name (unique per SQL text)
+        sql: Statement text using $1, $2, ... placeholders
+        params: Bind parameters
+        param_types: SQL type of each parameter, cast on the EXECUTE
+            arguments; needed for arrays, which psycopg2 sends as ARRAY[...]
+            expressions that would otherwise be typed text[]
+    """
+    if not _USE_PREPARED_STATEMENTS:
+        positions = [int(n) - 1 for n in _PLACEHOLDER_PATTERN.findall(sql)]
+        cursor.execute(
+            _PLACEHOLDER_PATTERN.sub("%s", sql), tuple(params[i] for i in positions)
+        )
+        return
+
+    connection = cursor.connection
+    # Checked before any statement below opens a transaction
+    in_transaction = (
+        connection.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE
+    )
+    with _PREPARED_STATEMENTS_LOCK:
+        prepared = _PREPARED_STATEMENTS.setdefault(connection, set())
+        if name not in prepared:
+            cursor.execute(f"PREPARE {name} AS {sql}")
+            prepared.add(name)
+
+    if param_types is None:
+        placeholders = ", ".join(["%s"] * len(params))
+    else:
+        placeholders = ", ".join(f"%s::{sql_type}" for sql_type in param_types)
+    execute_sql = f"EXECUTE {name} ({placeholders})"
+
+    try:
+        cursor.execute(execute_sql, params)
+    except errors.InvalidSqlStatementName:
+        # A reset drops every statement on the session, not just this one
+        with _PREPARED_STATEMENTS_LOCK:
+            prepared.clear()
+        if in_transaction:
+            raise
+
+        connection.rollback()
+        logger.warning("Prepared statement %s was lost; re-preparing", name)
+        with _PREPARED_STATEMENTS_LOCK:
+            cursor.execute(f"PREPARE {name} AS {sql}")
+            prepared.add(name)
+        cursor.execute(execute_sql, params)
 
 
 def _parse_pg_array(pg_array_str: str | list) -> list[str]:
@@ -53,7 +298,7 @@ class ProcessorRepository:
     _instance = None
     _db_connection = None
 
-    def __new__(cls):
+    def __new__(cls, db_connection: Any = None):
         if cls._instance is None:
             cls._instance = super(ProcessorRepository, cls).__new__(cls)
         return cls._instance
@@ -69,6 +314,27 @@ class ProcessorRepository:
             self._db_connection = db_connection
         self.db = self._db_connection
 
+    @classmethod
+    def bound(cls, db_connection: Any) -> "ProcessorRepository":
+        """
+        Create a repository tied to db_connection, outside the singleton.
+
+        For connections borrowed for a single call (e.g. from the pool): the
+        shared instance, and the connection other callers use through it,
+        are left untouched.
+
+        Args:
+            db_connection: Database connection or session (PostgreSQL/BigQuery)
+
+        Returns:
+            Repository instance that is not the process-wide singleton
+        """
+        # Bypass the singleton __new__, but initialize as usual; __init__
+        # stores the connection on the instance, not the class
+        repository = object.__new__(cls)
+        repository.__init__(db_connection)
+        return repository
+
     # =========================================================================
     # SYSTEM PROCESSOR CATALOG
     # =========================================================================
@@ -103,26 +369,12 @@ class ProcessorRepository:
         Returns:
             Purchased processor record or None if not found
         """
-        query = """
-        SELECT
-            id,
-            organization_id,
-            processor,
-            name,
-            auto,
-            status,
-            config,
-            price_amount,
-            price_unit,
-            price_currency,
-            purchased_at,
-            purchased_by
-        FROM purchased_processors
-        WHERE id = %s AND status != 'deleted'
-        """
-        # TODO: Execute query with db connection
-        # return self.db.execute(query, (purchased_processor_id,)).fetchone()
-        return None
+        return self._get_cached_purchased_processor(
+            ("id", purchased_processor_id),
+            "purchased_processor_by_id",
+            _PURCHASED_PROCESSOR_BY_ID_QUERY,
+            (purchased_processor_id,),
+        )
 
     def get_purchased_processors_by_organization(
         self, organization_id: str, enabled_only: bool = False, auto_only: bool = False
@@ -138,34 +390,22 @@ class ProcessorRepository:
         Returns:
             List of purchased processor records
         """
-        query = """
-        SELECT
-            id,
-            organization_id,
-            processor,
-            name,
-            auto,
-            status,
-            config,
-            price_amount,
-            price_unit,
-            price_currency,
-            purchased_at,
-            purchased_by
-        FROM purchased_processors
-        WHERE organization_id = %s
-        """
-
-        conditions = ["status = 'active'"] if enabled_only else ["status != 'deleted'"]
-        if auto_only:
-            conditions.append("auto = true")
+        statement_name, query = _PURCHASED_PROCESSORS_QUERIES[(enabled_only, auto_only)]
 
-        if conditions:
-            query += " AND " + " AND ".join(conditions)
+        try:
+            with self.db.cursor() as cursor:
+                _execute_prepared(cursor, statement_name, query, (organization_id,))
+                rows = cursor.fetchall()
+                columns = [desc[0] for desc in cursor.description or ()]
 
-        # TODO: Execute query with db connection
-        # return self.db.execute(query, (organization_id,)).fetchall()
-        return []
+            if rows and hasattr(rows[0], "keys"):
+                return [dict(row) for row in rows]
+            return [dict(zip(columns, row)) for row in rows]
+        except _RETRYABLE_ERRORS:
+            raise
+        except psycopg2.Error:
+            logger.exception("Error fetching purchased processors")
+            return []
 
     # =========================================================================
     # UNDERWRITING PROCESSORS (Underwriting Level)
@@ -183,30 +423,17 @@ class ProcessorRepository:
         Returns:
             Underwriting processor record or None
         """
-        query = """
-        SELECT
-            up.id,
-            up.organization_id,
-            up.underwriting_id,
-            up.organization_processor_id,
-            up.processor,
-            up.name,
-            up.auto,
-            up.enabled,
-            up.config_override,
-            up.effective_config,
-            up.current_executions_list,
-            op.config as organization_config,
-            op.price_amount,
-            op.price_unit
-        FROM underwriting_processors up
-        LEFT JOIN organization_processors op ON up.organization_processor_id = op.id
-        WHERE up.id = %s
-        """
+        query = _UNDERWRITING_PROCESSOR_SELECT + " WHERE up.id = $1"
         try:
-            cursor = self.db.cursor()
-            cursor.execute(query, (underwriting_processor_id,))
-            row = cursor.fetchone()
+            with self.db.cursor() as cursor:
+                _execute_prepared(
+                    cursor,
+                    "underwriting_processor_by_id",
+                    query,
+                    (underwriting_processor_id,),
+                )
+                row = cursor.fetchone()
+                columns = [desc[0] for desc in cursor.description or ()]
 
             if row:
                 # If using RealDictCursor, row is already dict-like
@@ -214,7 +441,6 @@ class ProcessorRepository:
                     result = dict(row)
                 else:
                     # Regular tuple row, need to convert
-                    columns = [desc[0] for desc in cursor.description]
                     result = dict(zip(columns, row))
 
                 # Parse current_executions_list from PostgreSQL array format
@@ -225,10 +451,50 @@ class ProcessorRepository:
 
                 return result
             return None
-        except Exception as e:
-            print(f"Error fetching underwriting processor: {e}")
+        except _RETRYABLE_ERRORS:
+            raise
+        except psycopg2.Error:
+            logger.exception("Error fetching underwriting processor")
             return None
 
+    def get_underwriting_processors_by_ids(
+        self, underwriting_processor_ids: list[str]
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Get several underwriting processor configurations in one query.
+
+        Args:
+            underwriting_processor_ids: UUIDs of underwriting processors
+
+        Returns:
+            Underwriting processor records keyed by ID; IDs that were not found
+            are absent
+        """
+        if not underwriting_processor_ids:
+            return {}
+
+        query = _UNDERWRITING_PROCESSOR_SELECT + " WHERE up.id = ANY(%s::uuid[])"
+        try:
+            with self.db.cursor() as cursor:
+                cursor.execute(query, (list(underwriting_processor_ids),))
+                rows = cursor.fetchall()
+                columns = [desc[0] for desc in cursor.description or ()]
+
+            result = {}
+            for row in rows:
+                record = dict(row) if hasattr(row, "keys") else dict(zip(columns, row))
+                if "current_executions_list" in record:
+                    record["current_executions_list"] = _parse_pg_array(
+                        record["current_executions_list"]
+                    )
+                result[str(record["id"])] = record
+            return result
+        except _RETRYABLE_ERRORS:
+            raise
+        except psycopg2.Error:
+            logger.exception("Error fetching underwriting processors by id")
+            return {}
+
     def get_underwriting_processors(
         self, underwriting_id: str, enabled_only: bool = True, auto_only: bool = False
     ) -> list[dict[str, Any]]:
@@ -243,42 +509,15 @@ class ProcessorRepository:
         Returns:
             List of underwriting processor configurations
         """
-        query = """
-        SELECT
-            up.id,
-            up.organization_id,
-            up.underwriting_id,
-            up.organization_processor_id,
-            up.processor,
-            up.name,
-            up.auto,
-            up.enabled,
-            up.config_override,
-            up.effective_config,
-            up.current_executions_list,
-            op.config as organization_config,
-            op.price_amount,
-            op.price_unit
-        FROM underwriting_processors up
-        LEFT JOIN organization_processors op ON up.organization_processor_id = op.id
-        WHERE up.underwriting_id = %s
-        """
-
-        conditions = []
-        if enabled_only:
-            conditions.append("up.enabled = true")
-        if auto_only:
-            conditions.append("up.auto = true")
-
-        if conditions:
-            query += " AND " + " AND ".join(conditions)
-
-        query += " ORDER BY up.created_at"
+        statement_name, query = _UNDERWRITING_PROCESSORS_QUERIES[
+            (enabled_only, auto_only)
+        ]
 
         try:
-            cursor = self.db.cursor()
-            cursor.execute(query, (underwriting_id,))
-            rows = cursor.fetchall()
+            with self.db.cursor() as cursor:
+                _execute_prepared(cursor, statement_name, query, (underwriting_id,))
+                rows = cursor.fetchall()
+                columns = [desc[0] for desc in cursor.description or ()]
 
             # If using RealDictCursor, rows are already dict-like
             # Otherwise, convert them
@@ -288,7 +527,6 @@ class ProcessorRepository:
                 result = [dict(row) for row in rows]
             else:
                 # Regular tuple rows, need to convert
-                columns = [desc[0] for desc in cursor.description]
                 result = [dict(zip(columns, row)) for row in rows]
 
             # Parse current_executions_list from PostgreSQL array format for each row
@@ -299,8 +537,46 @@ class ProcessorRepository:
                     )
 
             return result
-        except Exception as e:
-            print(f"Error fetching underwriting processors: {e}")
+        except _RETRYABLE_ERRORS:
+            raise
+        except psycopg2.Error:
+            logger.exception("Error fetching underwriting processors")
+            return []
+
+    def get_underwriting_processors_summary(
+        self, underwriting_id: str, enabled_only: bool = True, auto_only: bool = False
+    ) -> list[dict[str, Any]]:
+        """
+        Get the filter columns of the processors configured for an underwriting.
+
+        Lighter than get_underwriting_processors: returns only id, processor,
+        name, auto and enabled, without config blobs or current_executions_list.
+
+        Args:
+            underwriting_id: Underwriting UUID
+            enabled_only: If True, only return enabled processors
+            auto_only: If True, only return auto-execution processors
+
+        Returns:
+            List of underwriting processor summaries
+        """
+        statement_name, query = _UNDERWRITING_PROCESSORS_SUMMARY_QUERIES[
+            (enabled_only, auto_only)
+        ]
+
+        try:
+            with self.db.cursor() as cursor:
+                _execute_prepared(cursor, statement_name, query, (underwriting_id,))
+                rows = cursor.fetchall()
+                columns = [desc[0] for desc in cursor.description or ()]
+
+            if rows and hasattr(rows[0], "keys"):
+                return [dict(row) for row in rows]
+            return [dict(zip(columns, row)) for row in rows]
+        except _RETRYABLE_ERRORS:
+            raise
+        except psycopg2.Error:
+            logger.exception("Error fetching underwriting processor summaries")
             return []
 
     def update_current_executions_list(
@@ -320,18 +596,19 @@ class ProcessorRepository:
         UPDATE underwriting_processors
         SET
             current_executions_list = %s::uuid[],
-            updated_at = %s
+            updated_at = now()
         WHERE id = %s
         """
         try:
-            cursor = self.db.cursor()
-            cursor.execute(
-                query, (execution_ids, datetime.now(), underwriting_processor_id)
-            )
+            with self.db.cursor() as cursor:
+                cursor.execute(query, (execution_ids, underwriting_processor_id))
             self.db.commit()
             return True
-        except Exception as e:
-            print(f"Error updating current executions list: {e}")
+        except _RETRYABLE_ERRORS:
+            self.db.rollback()
+            raise
+        except psycopg2.Error:
+            logger.exception("Error updating current executions list")
             self.db.rollback()
             return False
 
@@ -354,20 +631,26 @@ class ProcessorRepository:
         Returns:
             Merged configuration dictionary
         """
-        processor_record = self.get_underwriting_processor_by_id(
-            underwriting_processor_id
-        )
-        if not processor_record:
+        try:
+            with self.db.cursor() as cursor:
+                _execute_prepared(
+                    cursor,
+                    "effective_config",
+                    _EFFECTIVE_CONFIG_QUERY,
+                    (underwriting_processor_id,),
+                )
+                row = cursor.fetchone()
+        except _RETRYABLE_ERRORS:
+            raise
+        except psycopg2.Error:
+            logger.exception("Error fetching effective config")
             return {}
 
-        # Start with purchased processor config
-        config = processor_record.get("purchased_config", {}) or {}
-
-        # Apply underwriting-specific overrides
-        overrides = processor_record.get("config_override", {}) or {}
-        config.update(overrides)
+        if not row:
+            return {}
 
-        return config
+        config = row["effective_config"] if hasattr(row, "keys") else row[0]
+        return config or {}
 
     def get_processor_by_name(
         self, processor_name: str, organization_id: str
@@ -382,24 +665,49 @@ class ProcessorRepository:
         Returns:
             Purchased processor record or None
         """
-        query = """
-        SELECT
-            id,
-            organization_id,
-            processor,
-            name,
-            auto,
-            status,
-            config,
-            price_amount,
-            price_unit,
-            price_currency
-        FROM purchased_processors
-        WHERE processor = %s
-          AND organization_id = %s
-          AND status = 'active'
-        LIMIT 1
+        return self._get_cached_purchased_processor(
+            ("name", organization_id, processor_name),
+            "purchased_processor_by_name",
+            _PURCHASED_PROCESSOR_BY_NAME_QUERY,
+            (processor_name, organization_id),
+        )
+
+    def _get_cached_purchased_processor(
+        self, cache_key: tuple, statement_name: str, query: str, params: tuple
+    ) -> Optional[dict[str, Any]]:
         """
-        # TODO: Execute query with db connection
-        # return self.db.execute(query, (processor_name, organization_id)).fetchone()
-        return None
+        Fetch a single purchased processor row through the TTL cache.
+
+        Args:
+            cache_key: Key in _PURCHASED_PROCESSOR_CACHE
+            statement_name: Prepared statement name for query
+            query: Statement text using $1, $2, ... placeholders
+            params: Bind parameters
+
+        Returns:
+            Purchased processor record or None
+        """
+        with _PURCHASED_PROCESSOR_CACHE_LOCK:
+            if cache_key in _PURCHASED_PROCESSOR_CACHE:
+                cached = _PURCHASED_PROCESSOR_CACHE[cache_key]
+                return dict(cached) if cached else None
+
+        try:
+            with self.db.cursor() as cursor:
+                _execute_prepared(cursor, statement_name, query, params)
+                row = cursor.fetchone()
+                columns = [desc[0] for desc in cursor.description or ()]
+        except _RETRYABLE_ERRORS:
+            raise
+        except psycopg2.Error:
+            logger.exception("Error fetching purchased processor")
+            return None
+
+        record = None
+        if row:
+            record = dict(row) if hasattr(row, "keys") else dict(zip(columns, row))
+
+        with _PURCHASED_PROCESSOR_CACHE_LOCK:
+            _PURCHASED_PROCESSOR_CACHE[cache_key] = record
+
+        return dict(record) if record else None
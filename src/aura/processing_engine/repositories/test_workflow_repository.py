@@ -5,24 +5,42 @@ Handles database operations for test_workflow table.
 Used for debugging and testing orchestration workflows.
 """
 
-from typing import Any, Optional
-import json
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
 import hashlib
-from datetime import datetime, date
+import logging
+import uuid
 from decimal import Decimal
 
+import orjson
+import psycopg2
+from psycopg2.extras import (
+    RealDictCursor,
+    execute_values,
+    register_default_json,
+    register_default_jsonb,
+)
 
-def _json_serial(obj):
-    """JSON serializer for objects not serializable by default."""
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    if isinstance(obj, date):
-        return obj.isoformat()
+logger = logging.getLogger(__name__)
+
+# Rows fetched per network round trip by server-side (named) cursors
+_STREAM_ITERSIZE = 500
+
+
+def _json_serial(obj: Any) -> Any:
+    """orjson fallback for types it does not serialize natively."""
     if isinstance(obj, Decimal):
         return float(obj)
     return str(obj)  # Fallback for any other type
 
 
+def _dumps(obj: Any, option: int = 0) -> bytes:
+    """Serialize to JSON bytes; datetime, date and UUID are handled natively."""
+    return orjson.dumps(
+        obj, default=_json_serial, option=orjson.OPT_NON_STR_KEYS | option
+    )
+
+
 class TestWorkflowRepository:
     """
     Repository for test workflow tracking.
@@ -30,10 +48,10 @@ class TestWorkflowRepository:
     Logs workflow execution stages for debugging and testing.
     """
 
-    _instance = None
-    _db_connection = None
+    _instance: Optional["TestWorkflowRepository"] = None
+    _db_connection: Any = None
 
-    def __new__(cls):
+    def __new__(cls, db_connection: Any = None) -> "TestWorkflowRepository":
         if cls._instance is None:
             cls._instance = super(TestWorkflowRepository, cls).__new__(cls)
         return cls._instance
@@ -47,8 +65,36 @@ class TestWorkflowRepository:
         """
         if db_connection is not None:
             self._db_connection = db_connection
+            # Decode json/jsonb columns with orjson instead of json.loads
+            register_default_json(db_connection, loads=orjson.loads)
+            register_default_jsonb(db_connection, loads=orjson.loads)
         self.db = self._db_connection
 
+    @contextmanager
+    def transaction(self) -> Iterator[Any]:
+        """
+        Group several stage writes under one cursor and a single commit.
+
+        Commits when the block exits normally and rolls back if it raises.
+
+        Example:
+            with test_workflow_repo.transaction() as cursor:
+                test_workflow_repo.log_stage(..., cursor=cursor)
+                test_workflow_repo.log_stage(..., cursor=cursor)
+
+        Yields:
+            Database cursor shared by every statement in the block
+        """
+        cursor = self.db.cursor()
+        try:
+            yield cursor
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            cursor.close()
+
     def log_stage(
         self,
         underwriting_id: str,
@@ -61,6 +107,7 @@ class TestWorkflowRepository:
         error_message: Optional[str] = None,
         execution_time_ms: Optional[int] = None,
         metadata: Optional[dict[str, Any]] = None,
+        cursor: Optional[Any] = None,
     ) -> str:
         """
         Log a workflow stage execution.
@@ -75,60 +122,116 @@ class TestWorkflowRepository:
             error_message: Error details if failed
             execution_time_ms: Execution time in milliseconds
             metadata: Additional debug info
+            cursor: Cursor from transaction(); when given, the caller owns the
+                commit
 
         Returns:
             Test workflow record ID
         """
-        try:
-            cursor = self.db.cursor()
-
-            # Generate hash from payload
-            payload_hash = self._generate_hash(payload)
-
-            cursor.execute(
-                """
-                INSERT INTO test_workflow (
-                    underwriting_id,
-                    workflow_name,
-                    stage,
-                    payload,
-                    input,
-                    payload_hash,
-                    output,
-                    status,
-                    error_message,
-                    execution_time_ms,
-                    metadata
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                )
-                RETURNING id
-            """,
-                (
-                    underwriting_id,
-                    workflow_name,
-                    stage,
-                    json.dumps(payload, default=_json_serial),
-                    json.dumps(input, default=_json_serial) if input else None,
-                    payload_hash,
-                    json.dumps(output, default=_json_serial) if output else None,
-                    status,
-                    error_message,
-                    execution_time_ms,
-                    json.dumps(metadata, default=_json_serial) if metadata else None,
-                ),
+        if cursor is None:
+            try:
+                with self.transaction() as cursor:
+                    return self.log_stage(
+                        underwriting_id,
+                        workflow_name,
+                        stage,
+                        payload,
+                        input=input,
+                        output=output,
+                        status=status,
+                        error_message=error_message,
+                        execution_time_ms=execution_time_ms,
+                        metadata=metadata,
+                        cursor=cursor,
+                    )
+            except psycopg2.Error:
+                logger.exception("Error logging test workflow stage")
+                raise
+
+        cursor.execute(
+            """
+            INSERT INTO test_workflow (
+                underwriting_id,
+                workflow_name,
+                stage,
+                payload,
+                input,
+                payload_hash,
+                output,
+                status,
+                error_message,
+                execution_time_ms,
+                metadata
+            ) VALUES (
+                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
             )
+            RETURNING id
+        """,
+            self._build_stage_row(
+                underwriting_id=underwriting_id,
+                workflow_name=workflow_name,
+                stage=stage,
+                payload=payload,
+                input=input,
+                output=output,
+                status=status,
+                error_message=error_message,
+                execution_time_ms=execution_time_ms,
+                metadata=metadata,
+            ),
+        )
+        return str(cursor.fetchone()["id"])
+
+    def log_stages_bulk(
+        self, records: list[dict[str, Any]], cursor: Optional[Any] = None
+    ) -> list[str]:
+        """
+        Log several workflow stages in one INSERT and one commit.
 
-            result = cursor.fetchone()
-            test_workflow_id = result["id"]
+        Args:
+            records: Stage records, each holding the keyword arguments
+                accepted by log_stage
+            cursor: Cursor from transaction(); when given, the caller owns the
+                commit
 
-            self.db.commit()
-            return str(test_workflow_id)
+        Returns:
+            Test workflow record IDs, in the order of records
+        """
+        if not records:
+            return []
 
-        except Exception as e:
-            self.db.rollback()
-            print(f"Error logging test workflow stage: {e}")
-            raise
+        if cursor is None:
+            try:
+                with self.transaction() as cursor:
+                    return self.log_stages_bulk(records, cursor=cursor)
+            except psycopg2.Error:
+                logger.exception("Error logging test workflow stages")
+                raise
+
+        rows = [self._build_stage_row(**record) for record in records]
+        results = execute_values(
+            cursor,
+            """
+            INSERT INTO test_workflow (
+                underwriting_id,
+                workflow_name,
+                stage,
+                payload,
+                input,
+                payload_hash,
+                output,
+                status,
+                error_message,
+                execution_time_ms,
+                metadata
+            ) VALUES %s
+            RETURNING id
+        """,
+            rows,
+            page_size=100,
+            fetch=True,
+        )
+        return [str(row["id"]) for row in results]
 
     def get_workflow_stages(
         self, underwriting_id: Optional[str] = None, workflow_name: Optional[str] = None
@@ -144,84 +247,139 @@ class TestWorkflowRepository:
             List of workflow stage records
         """
         try:
-            cursor = self.db.cursor()
-
-            query = """
-                SELECT
-                    id,
-                    underwriting_id,
-                    workflow_name,
-                    stage,
-                    payload,
-                    payload_hash,
-                    output,
-                    status,
-                    error_message,
-                    execution_time_ms,
-                    metadata,
-                    created_at,
-                    updated_at
-                FROM test_workflow
-                WHERE 1=1
-            """
-            params = []
+            return list(self.iter_workflow_stages(underwriting_id, workflow_name))
 
-            if underwriting_id:
-                query += " AND underwriting_id = %s"
-                params.append(underwriting_id)
+        except psycopg2.Error:
+            logger.exception("Error getting workflow stages")
+            return []
 
-            if workflow_name:
-                query += " AND workflow_name = %s"
-                params.append(workflow_name)
+    def iter_workflow_stages(
+        self, underwriting_id: Optional[str] = None, workflow_name: Optional[str] = None
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Stream workflow stage logs without loading them all into memory.
 
-            query += " ORDER BY created_at ASC"
+        Rows are fetched from a server-side cursor _STREAM_ITERSIZE at a time.
+        The cursor stays open until the iterator is exhausted or closed.
 
-            cursor.execute(query, tuple(params))
-            results = cursor.fetchall()
+        Args:
+            underwriting_id: Filter by underwriting ID
+            workflow_name: Filter by workflow name
 
-            cursor.close()
-            return [dict(row) for row in results]
+        Yields:
+            Workflow stage records in created_at order
+        """
+        query = """
+            SELECT
+                id,
+                underwriting_id,
+                workflow_name,
+                stage,
+                payload,
+                payload_hash,
+                output,
+                status,
+                error_message,
+                execution_time_ms,
+                metadata,
+                created_at,
+                updated_at
+            FROM test_workflow
+            WHERE 1=1
+        """
+        params: list[str] = []
 
-        except Exception as e:
-            print(f"Error getting workflow stages: {e}")
-            return []
+        if underwriting_id:
+            query += " AND underwriting_id = %s"
+            params.append(underwriting_id)
+
+        if workflow_name:
+            query += " AND workflow_name = %s"
+            params.append(workflow_name)
 
-    def clear_test_data(self, underwriting_id: Optional[str] = None) -> int:
+        query += " ORDER BY created_at ASC"
+
+        cursor = self.db.cursor(
+            name=f"workflow_stages_{uuid.uuid4().hex}", cursor_factory=RealDictCursor
+        )
+        cursor.itersize = _STREAM_ITERSIZE
+        try:
+            cursor.execute(query, tuple(params))
+            # RealDictCursor rows are already dicts
+            yield from cursor
+        finally:
+            cursor.close()
+
+    def clear_test_data(
+        self, underwriting_id: Optional[str] = None, cursor: Optional[Any] = None
+    ) -> int:
         """
         Clear test workflow data.
 
+        Clearing one underwriting is a DELETE served by
+        idx_test_workflow_underwriting; clearing everything is a TRUNCATE,
+        which drops the table's pages instead of deleting row by row.
+
         Args:
             underwriting_id: If provided, only clear for this underwriting
+            cursor: Cursor from transaction(); when given, the caller owns the
+                commit
 
         Returns:
-            Number of records deleted
+            Number of records deleted, or -1 when the whole table was
+            truncated (TRUNCATE reports no row count)
         """
-        try:
-            cursor = self.db.cursor()
-
-            if underwriting_id:
-                cursor.execute(
-                    """
-                    DELETE FROM test_workflow
-                    WHERE underwriting_id = %s
-                """,
-                    (underwriting_id,),
-                )
-            else:
-                cursor.execute("DELETE FROM test_workflow")
-
-            deleted_count = cursor.rowcount
-            self.db.commit()
-            cursor.close()
+        if cursor is None:
+            try:
+                with self.transaction() as cursor:
+                    return self.clear_test_data(underwriting_id, cursor=cursor)
+            except psycopg2.Error:
+                logger.exception("Error clearing test workflow data")
+                return 0
+
+        if underwriting_id:
+            cursor.execute(
+                """
+                DELETE FROM test_workflow
+                WHERE underwriting_id = %s
+            """,
+                (underwriting_id,),
+            )
+        else:
+            cursor.execute("TRUNCATE TABLE test_workflow")
 
-            return deleted_count
+        return cursor.rowcount
 
-        except Exception as e:
-            self.db.rollback()
-            print(f"Error clearing test workflow data: {e}")
-            return 0
-
-    def _generate_hash(self, payload: dict[str, Any]) -> str:
-        """Generate hash from payload for deduplication tracking."""
-        payload_str = json.dumps(payload, sort_keys=True, default=_json_serial)
-        return hashlib.sha256(payload_str.encode()).hexdigest()
+    def _build_stage_row(
+        self,
+        underwriting_id: str,
+        workflow_name: str,
+        stage: str,
+        payload: dict[str, Any],
+        input: Optional[dict[str, Any]] = None,
+        output: Optional[dict[str, Any]] = None,
+        status: str = "completed",
+        error_message: Optional[str] = None,
+        execution_time_ms: Optional[int] = None,
+        metadata: Optional[dict[str, Any]] = None,
+    ) -> tuple[Any, ...]:
+        """Serialize one stage into test_workflow INSERT column order."""
+        # One sorted-key pass feeds both the stored payload and its hash
+        payload_bytes = _dumps(payload, orjson.OPT_SORT_KEYS)
+        return (
+            underwriting_id,
+            workflow_name,
+            stage,
+            payload_bytes.decode(),
+            _dumps(input).decode() if input else None,
+            self._generate_hash(payload_bytes),
+            _dumps(output).decode() if output else None,
+            status,
+            error_message,
+            execution_time_ms,
+            _dumps(metadata).decode() if metadata else None,
+        )
+
+    def _generate_hash(self, payload_bytes: bytes) -> str:
+        """Generate hash from serialized payload for deduplication tracking."""
+        return hashlib.blake2b(payload_bytes, digest_size=16).hexdigest()
@@ -7,9 +7,284 @@ Handles database operations for underwriting data and owners:
 - Update underwriting records with processor output
 """
 
-from typing import Any, Optional
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
 from datetime import datetime
-import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from psycopg2.extras import RealDictCursor
+
+from ..exceptions import ConcurrentUpdateError
+from .processor_repository import _execute_prepared
+
+
+class RateLimitingFilter(logging.Filter):
+    """
+    Token-bucket filter that caps how many records reach the log handlers.
+
+    Each record spends one token; tokens refill at rate per second up to
+    burst. Records arriving with an empty bucket are dropped, so a failure
+    storm costs one counter update per call instead of a formatted write.
+    """
+
+    def __init__(self, rate: float = 10.0, burst: int = 20):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+logger = logging.getLogger(__name__)
+logger.addFilter(RateLimitingFilter())
+
+# Owner address columns, selected with an "address_" prefix next to the owner
+_OWNER_ADDRESS_COLUMNS = (
+    "id",
+    "addr_1",
+    "addr_2",
+    "city",
+    "state",
+    "zip",
+    "created_at",
+    "updated_at",
+)
+
+# Owners joined to their address in one pass. owner_address is not unique per
+# owner, so the lateral subquery keeps the one-address-per-owner shape.
+_OWNERS_WITH_ADDRESS_SELECT = """
+SELECT
+    o.id AS owner_id,
+    o.underwriting_id,
+    o.first_name,
+    o.last_name,
+    o.email,
+    o.phone_mobile,
+    o.phone_home,
+    o.phone_work,
+    o.birthday,
+    o.fico_score,
+    o.ssn,
+    o.ownership_percent,
+    o.primary_owner,
+    o.enabled,
+    o.row_version,
+    o.created_at,
+    o.updated_at,
+    a.id AS address_id,
+    a.addr_1 AS address_addr_1,
+    a.addr_2 AS address_addr_2,
+    a.city AS address_city,
+    a.state AS address_state,
+    a.zip AS address_zip,
+    a.created_at AS address_created_at,
+    a.updated_at AS address_updated_at
+FROM owner o
+LEFT JOIN LATERAL (
+    SELECT id, addr_1, addr_2, city, state, zip, created_at, updated_at
+    FROM owner_address
+    WHERE owner_id = o.id
+    LIMIT 1
+) a ON true
+"""
+
+
+def _owner_with_address(row: Any) -> dict[str, Any]:
+    """Split a row of _OWNERS_WITH_ADDRESS_SELECT into an owner with "address".
+
+    The RealDictRow is reshaped in place rather than copied.
+    """
+    row.pop("underwriting_id")
+    address = {
+        column: row.pop(f"address_{column}") for column in _OWNER_ADDRESS_COLUMNS
+    }
+    row["address"] = address if address["id"] is not None else None
+    return row
+
+
+# Per-owner columns, each bound as one array and expanded with unnest(). The
+# statement text does not depend on the number of owners, so it can be
+# prepared once per connection.
+_OWNER_ARRAY_COLUMNS = (
+    ("id", "uuid"),
+    ("first_name", "text"),
+    ("last_name", "text"),
+    ("email", "text"),
+    ("phone_mobile", "text"),
+    ("phone_home", "text"),
+    ("phone_work", "text"),
+    ("ssn", "text"),
+    ("ownership_percent", "numeric"),
+    ("primary_owner", "boolean"),
+)
+
+
+def _owner_insert_sql(first: int) -> str:
+    """
+    Build an INSERT of owners from unnest()ed column arrays.
+
+    Parameters are numbered from $first: underwriting_id, created_by,
+    updated_by, then one array per _OWNER_ARRAY_COLUMNS entry. enabled,
+    created_at and updated_at come from the column defaults (true and NOW(),
+    i.e. the transaction timestamp).
+    """
+    names = [name for name, _ in _OWNER_ARRAY_COLUMNS]
+    arrays = ", ".join(
+        f"${first + 3 + index}::{sql_type}[]"
+        for index, (_, sql_type) in enumerate(_OWNER_ARRAY_COLUMNS)
+    )
+    return f"""
+    INSERT INTO owner (
+        underwriting_id, created_by, updated_by, {", ".join(names)}
+    )
+    SELECT ${first}::uuid, ${first + 1}::uuid, ${first + 2}::uuid, o.*
+    FROM unnest({arrays}) AS o ({", ".join(names)})
+"""
+
+
+_OWNER_INSERT_SQL = _owner_insert_sql(1)
+_OWNER_INSERT_PARAM_TYPES = ("uuid", "uuid", "uuid") + tuple(
+    f"{sql_type}[]" for _, sql_type in _OWNER_ARRAY_COLUMNS
+)
+
+# Every owner write in one statement, so a save costs one round trip: the
+# row versions callers read the owners at ($1, $2), the soft delete of
+# enabled owners missing from the input, and the upsert (parameters from $3,
+# see _owner_insert_sql). The soft delete excludes every input id, so it
+# never touches a row the upsert writes.
+#
+# Only enabled owners of the same underwriting, still at the row version the
+# caller sent (if any), may be updated through the upsert; any other
+# conflicting id leaves the row out of RETURNING. The version check runs on
+# the locked, latest row, so a concurrent commit cannot slip past it.
+# xmax = 0 marks rows that were freshly inserted.
+_OWNER_SAVE_SQL = (
+    """
+WITH expected AS (
+    SELECT * FROM unnest($1::uuid[], $2::int[]) AS e (id, row_version)
+),
+removed AS (
+    UPDATE owner
+    SET enabled = false,
+        row_version = row_version + 1,
+        updated_at = CURRENT_TIMESTAMP,
+        updated_by = $5::uuid
+    WHERE underwriting_id = $3::uuid
+      AND enabled = true
+      AND id <> ALL($6::uuid[])
+    RETURNING id
+),
+upserted AS (
+"""
+    + _owner_insert_sql(3)
+    + """
+    ON CONFLICT (id) DO UPDATE
+    SET first_name = EXCLUDED.first_name,
+        last_name = EXCLUDED.last_name,
+        email = EXCLUDED.email,
+        phone_mobile = EXCLUDED.phone_mobile,
+        phone_home = EXCLUDED.phone_home,
+        phone_work = EXCLUDED.phone_work,
+        ssn = EXCLUDED.ssn,
+        ownership_percent = EXCLUDED.ownership_percent,
+        primary_owner = EXCLUDED.primary_owner,
+        row_version = owner.row_version + 1,
+        updated_at = CURRENT_TIMESTAMP,
+        updated_by = EXCLUDED.updated_by
+    WHERE owner.underwriting_id = EXCLUDED.underwriting_id
+      AND owner.enabled = true
+      AND owner.row_version = COALESCE(
+          (SELECT e.row_version FROM expected e WHERE e.id = owner.id),
+          owner.row_version
+      )
+    RETURNING id,
+        CASE WHEN xmax = 0 THEN 'inserted' ELSE 'updated' END AS operation
+)
+SELECT id, operation FROM upserted
+UNION ALL
+SELECT id, 'removed' FROM removed
+"""
+)
+
+_OWNER_SAVE_PARAM_TYPES = ("uuid[]", "int[]") + _OWNER_INSERT_PARAM_TYPES
+
+# Soft delete of every enabled owner, for an empty owners list
+_OWNER_SOFT_DELETE_ALL_SQL = """
+UPDATE owner
+SET enabled = false,
+    row_version = row_version + 1,
+    updated_at = CURRENT_TIMESTAMP,
+    updated_by = $1::uuid
+WHERE underwriting_id = $2::uuid
+  AND enabled = true
+RETURNING id
+"""
+
+_OWNER_RESTORE_SQL = """
+UPDATE owner
+SET enabled = true,
+    row_version = row_version + 1,
+    updated_at = CURRENT_TIMESTAMP,
+    updated_by = $1::uuid
+WHERE id = $2::uuid
+"""
+
+_OWNERS_SELECT = """
+SELECT id as owner_id, first_name, last_name, email,
+       phone_mobile, phone_home, phone_work, ssn,
+       ownership_percent, primary_owner, enabled,
+       row_version, created_at, updated_at
+FROM owner
+WHERE underwriting_id = $1::uuid
+"""
+
+# get_owners variants: (prepared statement name, SQL) keyed by enabled_only
+_OWNERS_QUERIES = {
+    False: (
+        "underwriting_owners_all",
+        _OWNERS_SELECT + " ORDER BY primary_owner DESC, first_name",
+    ),
+    True: (
+        "underwriting_owners_enabled",
+        _OWNERS_SELECT + " AND enabled = true ORDER BY primary_owner DESC, first_name",
+    ),
+}
+
+
+def _new_uuids(count: int) -> list[str]:
+    """Generate count random (version 4) UUID strings from one urandom read."""
+    random_bytes = os.urandom(16 * count)
+    return [
+        str(uuid.UUID(bytes=random_bytes[offset : offset + 16], version=4))
+        for offset in range(0, 16 * count, 16)
+    ]
+
+
+def _parse_owner_id(owner_id: Any) -> Optional[str]:
+    """Return owner_id as a canonical UUID string, or None if it is not one."""
+    if not owner_id:
+        return None
+    try:
+        return str(uuid.UUID(str(owner_id)))
+    except ValueError:
+        return None
 
 
 class UnderwritingRepository:
@@ -25,7 +300,29 @@ class UnderwritingRepository:
     _instance = None
     _db_connection = None
 
-    def __new__(cls):
+    # Application form dot-notation keys -> underwriting columns
+    _FORM_FIELD_MAPPING = {
+        "merchant.name": "merchant_name",
+        "merchant.dba_name": "merchant_dba_name",
+        "merchant.ein": "merchant_ein",
+        "merchant.industry": "merchant_industry",
+        "merchant.email": "merchant_email",
+        "merchant.phone": "merchant_phone",
+        "merchant.website": "merchant_website",
+        "merchant.entity_type": "merchant_entity_type",
+        "merchant.incorporation_date": "merchant_incorporation_date",
+        "merchant.state_of_incorporation": "merchant_state_of_incorporation",
+    }
+
+    # (prepared statement name, UPDATE) keyed by the form keys they set, in
+    # mapping order, and whether they check row_version. Bounded by the 2^11
+    # combinations.
+    _FORM_UPDATE_SQL_CACHE: dict[tuple[tuple[str, ...], bool], tuple[str, str]] = {}
+
+    # Cursor of the transaction() block open on the current thread, if any
+    _tx_state = threading.local()
+
+    def __new__(cls, db_connection: Any = None):
         if cls._instance is None:
             cls._instance = super(UnderwritingRepository, cls).__new__(cls)
         return cls._instance
@@ -41,12 +338,55 @@ class UnderwritingRepository:
             self._db_connection = db_connection
         self.db = self._db_connection
 
+    # =========================================================================
+    # TRANSACTIONS
+    # =========================================================================
+
+    @contextmanager
+    def transaction(self) -> Iterator[Any]:
+        """
+        Run several statements on one cursor under a single commit.
+
+        Commits when the block exits normally and rolls back if it raises.
+        A transaction() opened inside another one on the same thread joins
+        it: it yields the outer cursor and leaves the commit to the
+        outermost block.
+
+        Example:
+            with underwriting_repo.transaction() as cursor:
+                underwriting_repo._save_application_form(cursor, ...)
+                underwriting_repo._save_owners_list(cursor, ...)
+
+        Yields:
+            Database cursor shared by every statement in the block
+        """
+        outer_cursor = getattr(self._tx_state, "cursor", None)
+        if outer_cursor is not None:
+            yield outer_cursor
+            return
+
+        cursor = self.db.cursor(cursor_factory=RealDictCursor)
+        self._tx_state.cursor = cursor
+        try:
+            yield cursor
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            self._tx_state.cursor = None
+            cursor.close()
+
     # =========================================================================
     # APPLICATION FORM PERSISTENCE
     # =========================================================================
 
     def save_application_form(
-        self, underwriting_id: str, form_data: dict[str, Any], merge: bool = True
+        self,
+        underwriting_id: str,
+        form_data: dict[str, Any],
+        merge: bool = True,
+        expected_row_version: Optional[int] = None,
     ) -> bool:
         """
         Save or update application form data to individual columns.
@@ -55,10 +395,16 @@ class UnderwritingRepository:
             underwriting_id: The underwriting ID
             form_data: Dictionary with dot-notation keys (e.g., "merchant.ein")
             merge: If True, only update provided fields; if False, update all fields
+            expected_row_version: row_version the caller read the underwriting
+                at; when given, the save only applies if it still matches
 
         Returns:
             True if successful, False otherwise
 
+        Raises:
+            ConcurrentUpdateError: The underwriting changed since
+                expected_row_version was read
+
         Example:
             form_data = {
                 "merchant.name": "ABC Tech Inc",
@@ -66,56 +412,80 @@ class UnderwritingRepository:
                 "merchant.industry": "Technology"
             }
         """
-        try:
-            cursor = self.db.cursor()
-
-            # Build UPDATE statement for provided fields
-            update_fields = []
-            params = []
-
-            # Map dot-notation keys to column names
-            field_mapping = {
-                "merchant.name": "merchant_name",
-                "merchant.dba_name": "merchant_dba_name",
-                "merchant.ein": "merchant_ein",
-                "merchant.industry": "merchant_industry",
-                "merchant.email": "merchant_email",
-                "merchant.phone": "merchant_phone",
-                "merchant.website": "merchant_website",
-                "merchant.entity_type": "merchant_entity_type",
-                "merchant.incorporation_date": "merchant_incorporation_date",
-                "merchant.state_of_incorporation": "merchant_state_of_incorporation",
-            }
-
-            for dot_key, column_name in field_mapping.items():
-                if dot_key in form_data:
-                    update_fields.append(f"{column_name} = %s")
-                    params.append(form_data[dot_key])
+        keys = self._form_keys(form_data)
+        if not keys:
+            # No fields to update; skip the cursor and the empty transaction
+            return True
 
-            if not update_fields:
-                # No fields to update
-                return True
+        try:
+            with self.transaction() as cursor:
+                self._save_application_form(
+                    cursor, underwriting_id, form_data, keys, expected_row_version
+                )
+            return True
 
-            # Add updated_at
-            update_fields.append("updated_at = CURRENT_TIMESTAMP")
+        except ConcurrentUpdateError:
+            raise
 
-            # Build and execute UPDATE query
-            params.append(underwriting_id)
-            query = f"""
-                UPDATE underwriting
-                SET {', '.join(update_fields)}
-                WHERE id = %s
-            """
+        except Exception:
+            logger.exception("Error saving application form")
+            return False
 
-            cursor.execute(query, tuple(params))
+    def _form_keys(self, form_data: dict[str, Any]) -> tuple[str, ...]:
+        """Return the mapped keys present in form_data, in mapping order."""
+        # Walk the mapping rather than form_data so the same key set always
+        # yields the same column order, and therefore the same SQL text
+        return tuple(key for key in self._FORM_FIELD_MAPPING if key in form_data)
 
-            self.db.commit()
-            return True
-
-        except Exception as e:
-            self.db.rollback()
-            print(f"Error saving application form: {e}")
-            return False
+    def _save_application_form(
+        self,
+        cursor: Any,
+        underwriting_id: str,
+        form_data: dict[str, Any],
+        keys: tuple[str, ...],
+        expected_row_version: Optional[int] = None,
+    ) -> None:
+        """Write the given application form keys on cursor without committing."""
+        if not keys:
+            # No fields to update
+            return
+
+        versioned = expected_row_version is not None
+        statement = self._FORM_UPDATE_SQL_CACHE.get((keys, versioned))
+        if statement is None:
+            assignments = ", ".join(
+                f"{self._FORM_FIELD_MAPPING[key]} = ${position}"
+                for position, key in enumerate(keys, start=1)
+            )
+            query = (
+                f"UPDATE underwriting SET {assignments}, "
+                "row_version = row_version + 1, "
+                f"updated_at = CURRENT_TIMESTAMP WHERE id = ${len(keys) + 1}"
+            )
+            # The name encodes the key set as a bitmask over the mapping
+            mask = sum(
+                1 << index
+                for index, key in enumerate(self._FORM_FIELD_MAPPING)
+                if key in keys
+            )
+            name = f"underwriting_form_{mask:x}"
+            if versioned:
+                query += f" AND row_version = ${len(keys) + 2}"
+                name += "_versioned"
+            statement = (name, query)
+            self._FORM_UPDATE_SQL_CACHE[(keys, versioned)] = statement
+
+        params = [form_data[key] for key in keys]
+        params.append(underwriting_id)
+        if versioned:
+            params.append(expected_row_version)
+        _execute_prepared(cursor, *statement, tuple(params))
+
+        if versioned and cursor.rowcount == 0:
+            raise ConcurrentUpdateError(
+                f"Underwriting {underwriting_id} changed since row_version "
+                f"{expected_row_version}"
+            )
 
     # =========================================================================
     # OWNERS LIST MANAGEMENT
@@ -132,10 +502,17 @@ class UnderwritingRepository:
         Save owners list with automatic INSERT/UPDATE/SOFT DELETE logic.
 
         Logic:
-        - If owner has owner_id and exists in DB: UPDATE
-        - If owner has no owner_id: INSERT new owner
+        - If owner has owner_id of an enabled owner of this underwriting: UPDATE
+        - Otherwise: INSERT new owner
         - If existing owner not in input list: SOFT DELETE (enabled = false)
 
+        Inserts, updates and soft deletes run as one prepared statement: an
+        INSERT ... ON CONFLICT (id) DO UPDATE behind a soft delete CTE, with
+        the owners bound as one array per column.
+
+        An owner may carry the "row_version" it was read at; it is then only
+        updated if the stored owner is still at that version.
+
         Args:
             underwriting_id: The underwriting ID
             owners_list: List of owner dictionaries from processor output
@@ -145,10 +522,15 @@ class UnderwritingRepository:
         Returns:
             Dictionary with lists of inserted, updated, and removed owner IDs
 
+        Raises:
+            ConcurrentUpdateError: An owner sent with a row_version changed
+                since that version was read
+
         Example:
             owners_list = [
                 {
                     "owner_id": "owner_001",  # Existing - will UPDATE
+                    "row_version": 3,  # Optional - must still match
                     "first_name": "John",
                     "last_name": "Doe",
                     "email": "john@example.com",
@@ -163,138 +545,127 @@ class UnderwritingRepository:
                 }
             ]
         """
-        operations = {"inserted": [], "updated": [], "removed": []}
-
         try:
-            cursor = self.db.cursor()
+            with self.transaction() as cursor:
+                return self._save_owners_list(
+                    cursor, underwriting_id, owners_list, created_by, updated_by
+                )
 
-            # Step 1: Get existing owner IDs from database
-            cursor.execute(
-                """
-                SELECT id as owner_id
-                FROM owner
-                WHERE underwriting_id = %s AND enabled = true
-            """,
-                (underwriting_id,),
-            )
+        except Exception:
+            logger.exception("Error saving owners list")
+            raise
 
-            existing_owner_ids = {row["owner_id"] for row in cursor.fetchall()}
+    def _save_owners_list(
+        self,
+        cursor: Any,
+        underwriting_id: str,
+        owners_list: list[dict[str, Any]],
+        created_by: Optional[str] = None,
+        updated_by: Optional[str] = None,
+    ) -> dict[str, list[str]]:
+        """Upsert and soft delete owners on cursor without committing."""
+        operations = {"inserted": [], "updated": [], "removed": []}
 
-            # Step 2: Extract owner IDs from input
-            input_owner_ids = {
-                owner["owner_id"]
-                for owner in owners_list
-                if owner.get("owner_id") is not None
-            }
+        # Step 1: One row per owner. Owners carrying a valid owner_id keep it
+        # so the upsert can match them (last occurrence wins); the rest get
+        # a new ID from a block generated up front
+        parsed_owners = [
+            (_parse_owner_id(owner_data.get("owner_id")), owner_data)
+            for owner_data in owners_list
+        ]
+        new_ids = iter(
+            _new_uuids(sum(1 for owner_id, _ in parsed_owners if owner_id is None))
+        )
+        rows_by_id: dict[str, tuple] = {}
+        expected_versions: dict[str, int] = {}
+        for owner_id, owner_data in parsed_owners:
+            if owner_id is None:
+                owner_id = next(new_ids)
+            elif owner_data.get("row_version") is not None:
+                expected_versions[owner_id] = owner_data["row_version"]
+            else:
+                expected_versions.pop(owner_id, None)
+            rows_by_id[owner_id] = (
+                owner_id,
+                owner_data.get("first_name"),
+                owner_data.get("last_name"),
+                owner_data.get("email"),
+                owner_data.get("phone_mobile"),
+                owner_data.get("phone_home"),
+                owner_data.get("phone_work"),
+                owner_data.get("ssn"),
+                owner_data.get("ownership_percent"),
+                owner_data.get("primary_owner", False),
+            )
 
-            # Step 3: Calculate removed owners
-            removed_owner_ids = existing_owner_ids - input_owner_ids
-
-            # Step 4: Process each owner in input
-            for owner_data in owners_list:
-                owner_id = owner_data.get("owner_id")
-
-                if owner_id and owner_id in existing_owner_ids:
-                    # EXISTING OWNER - UPDATE
-                    cursor.execute(
-                        """
-                        UPDATE owner
-                        SET first_name = %s,
-                            last_name = %s,
-                            email = %s,
-                            phone_mobile = %s,
-                            phone_home = %s,
-                            phone_work = %s,
-                            ssn = %s,
-                            ownership_percent = %s,
-                            primary_owner = %s,
-                            updated_at = CURRENT_TIMESTAMP,
-                            updated_by = %s
-                        WHERE id = %s
-                    """,
-                        (
-                            owner_data.get("first_name"),
-                            owner_data.get("last_name"),
-                            owner_data.get("email"),
-                            owner_data.get("phone_mobile"),
-                            owner_data.get("phone_home"),
-                            owner_data.get("phone_work"),
-                            owner_data.get("ssn"),
-                            owner_data.get("ownership_percent"),
-                            owner_data.get("primary_owner", False),
-                            updated_by,
-                            owner_id,
-                        ),
-                    )
-                    operations["updated"].append(owner_id)
-
-                else:
-                    # NEW OWNER - INSERT
-                    new_owner_id = self._generate_uuid()
-                    cursor.execute(
-                        """
-                        INSERT INTO owner (
-                            id,
-                            underwriting_id,
-                            first_name,
-                            last_name,
-                            email,
-                            phone_mobile,
-                            phone_home,
-                            phone_work,
-                            ssn,
-                            ownership_percent,
-                            primary_owner,
-                            enabled,
-                            created_at,
-                            updated_at,
-                            created_by,
-                            updated_by
-                        ) VALUES (
-                            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                            true, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, %s, %s
-                        )
-                    """,
-                        (
-                            new_owner_id,
-                            underwriting_id,
-                            owner_data.get("first_name"),
-                            owner_data.get("last_name"),
-                            owner_data.get("email"),
-                            owner_data.get("phone_mobile"),
-                            owner_data.get("phone_home"),
-                            owner_data.get("phone_work"),
-                            owner_data.get("ssn"),
-                            owner_data.get("ownership_percent"),
-                            owner_data.get("primary_owner", False),
-                            created_by,
-                            updated_by,
-                        ),
-                    )
-                    operations["inserted"].append(new_owner_id)
+        if not rows_by_id:
+            # Empty input: every enabled owner is soft deleted
+            _execute_prepared(
+                cursor,
+                "underwriting_soft_delete_owners",
+                _OWNER_SOFT_DELETE_ALL_SQL,
+                (updated_by, underwriting_id),
+            )
+            operations["removed"] = [str(row["id"]) for row in cursor.fetchall()]
+            return operations
 
-            # Step 5: Soft delete removed owners
-            for removed_id in removed_owner_ids:
-                cursor.execute(
-                    """
-                    UPDATE owner
-                    SET enabled = false,
-                        updated_at = CURRENT_TIMESTAMP,
-                        updated_by = %s
-                    WHERE id = %s
-                """,
-                    (updated_by, removed_id),
-                )
-                operations["removed"].append(removed_id)
+        # Step 2: Soft delete owners missing from the input and upsert the
+        # rest in one statement; Postgres decides between INSERT and UPDATE
+        _execute_prepared(
+            cursor,
+            "underwriting_save_owners",
+            _OWNER_SAVE_SQL,
+            (
+                list(expected_versions),
+                list(expected_versions.values()),
+                underwriting_id,
+                created_by,
+                updated_by,
+                *(list(column) for column in zip(*rows_by_id.values())),
+            ),
+            _OWNER_SAVE_PARAM_TYPES,
+        )
+        for row in cursor.fetchall():
+            operations[row["operation"]].append(str(row["id"]))
+        kept_owner_ids = set(operations["inserted"]) | set(operations["updated"])
+
+        # A versioned owner that was not updated was changed or removed by
+        # someone else since it was read
+        stale_owner_ids = expected_versions.keys() - kept_owner_ids
+        if stale_owner_ids:
+            raise ConcurrentUpdateError(
+                f"Owners changed since they were read: {sorted(stale_owner_ids)}"
+            )
 
-            # Commit transaction
-            self.db.commit()
-            return operations
+        # Step 3: Unversioned IDs that matched a disabled owner or another
+        # underwriting's owner were not touched; save those owners as new
+        # ones. Their ids were excluded from the soft delete, which is
+        # harmless because no enabled owner of this underwriting carries them
+        untouched_rows = [
+            row
+            for owner_id, row in rows_by_id.items()
+            if owner_id not in kept_owner_ids
+        ]
+        retry_rows = [
+            (new_id, *row[1:])
+            for new_id, row in zip(_new_uuids(len(untouched_rows)), untouched_rows)
+        ]
+        if retry_rows:
+            _execute_prepared(
+                cursor,
+                "underwriting_insert_owners",
+                _OWNER_INSERT_SQL,
+                (
+                    underwriting_id,
+                    created_by,
+                    updated_by,
+                    *(list(column) for column in zip(*retry_rows)),
+                ),
+                _OWNER_INSERT_PARAM_TYPES,
+            )
+            operations["inserted"].extend(row[0] for row in retry_rows)
 
-        except Exception as e:
-            self.db.rollback()
-            print(f"Error saving owners list: {e}")
-            raise
+        return operations
 
     # =========================================================================
     # COMBINED OPERATIONS
@@ -305,6 +676,7 @@ class UnderwritingRepository:
         underwriting_id: str,
         processor_output: dict[str, Any],
         user_id: Optional[str] = None,
+        expected_row_version: Optional[int] = None,
     ) -> dict[str, Any]:
         """
         Save complete processor output (application form + owners list).
@@ -316,9 +688,12 @@ class UnderwritingRepository:
             underwriting_id: The underwriting ID
             processor_output: Complete processor output with application_form and owners_list
             user_id: User ID for audit fields (optional)
+            expected_row_version: Underwriting row_version for the form save
+                (optional, see save_application_form)
 
         Returns:
-            Dictionary with operation results
+            Dictionary with operation results; a version conflict on the form
+            or an owner rolls back both and is reported in "error"
 
         Example:
             processor_output = {
@@ -349,28 +724,39 @@ class UnderwritingRepository:
             "error": None,
         }
 
+        application_form = processor_output.get("application_form") or {}
+        form_keys = self._form_keys(application_form)
+        owners_list = processor_output.get("owners_list", [])
+
+        # Nothing to write: skip the cursor and an empty BEGIN/COMMIT
+        if not form_keys and owners_list is None:
+            return result
+
         try:
-            # Save application form
-            application_form = processor_output.get("application_form", {})
-            if application_form:
-                success = self.save_application_form(
-                    underwriting_id=underwriting_id,
-                    form_data=application_form,
-                    merge=True,
-                )
-                result["application_form_saved"] = success
-
-            # Save owners list
-            owners_list = processor_output.get("owners_list", [])
-            if owners_list is not None:  # Allow empty list (removes all owners)
-                operations = self.save_owners_list(
-                    underwriting_id=underwriting_id,
-                    owners_list=owners_list,
-                    created_by=user_id,
-                    updated_by=user_id,
+            # Form and owners become visible together with a single commit
+            with self.transaction() as cursor:
+                # Save application form
+                self._save_application_form(
+                    cursor,
+                    underwriting_id,
+                    application_form,
+                    form_keys,
+                    expected_row_version,
                 )
-                result["owners_operations"] = operations
 
+                # Save owners list
+                operations = None
+                if owners_list is not None:  # Allow empty list (removes all owners)
+                    operations = self._save_owners_list(
+                        cursor,
+                        underwriting_id=underwriting_id,
+                        owners_list=owners_list,
+                        created_by=user_id,
+                        updated_by=user_id,
+                    )
+
+            result["application_form_saved"] = bool(form_keys)
+            result["owners_operations"] = operations
             return result
 
         except Exception as e:
@@ -381,12 +767,6 @@ class UnderwritingRepository:
     # HELPER METHODS
     # =========================================================================
 
-    def _generate_uuid(self) -> str:
-        """Generate a UUID for new records."""
-        import uuid
-
-        return str(uuid.uuid4())
-
     def get_owners(
         self, underwriting_id: str, enabled_only: bool = True
     ) -> list[dict[str, Any]]:
@@ -401,27 +781,13 @@ class UnderwritingRepository:
             List of owner dictionaries
         """
         try:
-            cursor = self.db.cursor()
-
-            query = """
-                SELECT id as owner_id, first_name, last_name, email,
-                       phone_mobile, phone_home, phone_work, ssn,
-                       ownership_percent, primary_owner, enabled,
-                       created_at, updated_at
-                FROM owner
-                WHERE underwriting_id = %s
-            """
+            statement_name, query = _OWNERS_QUERIES[bool(enabled_only)]
+            with self.db.cursor(cursor_factory=RealDictCursor) as cursor:
+                _execute_prepared(cursor, statement_name, query, (underwriting_id,))
+                return cursor.fetchall()
 
-            if enabled_only:
-                query += " AND enabled = true"
-
-            query += " ORDER BY primary_owner DESC, first_name"
-
-            cursor.execute(query, (underwriting_id,))
-            return cursor.fetchall()
-
-        except Exception as e:
-            print(f"Error fetching owners: {e}")
+        except Exception:
+            logger.exception("Error fetching owners")
             return []
 
     def restore_owner(self, owner_id: str, user_id: Optional[str] = None) -> bool:
@@ -436,24 +802,17 @@ class UnderwritingRepository:
             True if successful, False otherwise
         """
         try:
-            cursor = self.db.cursor()
-            cursor.execute(
-                """
-                UPDATE owner
-                SET enabled = true,
-                    updated_at = CURRENT_TIMESTAMP,
-                    updated_by = %s
-                WHERE id = %s
-            """,
-                (user_id, owner_id),
-            )
-
-            self.db.commit()
+            with self.transaction() as cursor:
+                _execute_prepared(
+                    cursor,
+                    "underwriting_restore_owner",
+                    _OWNER_RESTORE_SQL,
+                    (user_id, owner_id),
+                )
             return True
 
-        except Exception as e:
-            self.db.rollback()
-            print(f"Error restoring owner: {e}")
+        except Exception:
+            logger.exception("Error restoring owner")
             return False
 
     # =========================================================================
@@ -474,63 +833,59 @@ class UnderwritingRepository:
             or None if not found
         """
         try:
-            cursor = self.db.cursor()
-
-            # Get underwriting
-            cursor.execute(
-                """
-                SELECT
-                    id,
-                    organization_id,
-                    serial_number,
-                    status,
-                    application_type,
-                    application_ref_id,
-                    request_amount,
-                    request_date,
-                    purpose,
-                    merchant_name,
-                    merchant_dba_name,
-                    merchant_ein,
-                    merchant_industry,
-                    merchant_email,
-                    merchant_phone,
-                    merchant_website,
-                    merchant_entity_type,
-                    merchant_incorporation_date,
-                    merchant_state_of_incorporation,
-                    created_at,
-                    updated_at
-                FROM underwriting
-                WHERE id = %s
-            """,
-                (underwriting_id,),
-            )
-
-            uw = cursor.fetchone()
-
-            if not uw:
-                return None
+            with self.db.cursor(cursor_factory=RealDictCursor) as cursor:
+                # Get underwriting
+                cursor.execute(
+                    """
+                    SELECT
+                        id,
+                        organization_id,
+                        serial_number,
+                        status,
+                        application_type,
+                        application_ref_id,
+                        request_amount,
+                        request_date,
+                        purpose,
+                        merchant_name,
+                        merchant_dba_name,
+                        merchant_ein,
+                        merchant_industry,
+                        merchant_email,
+                        merchant_phone,
+                        merchant_website,
+                        merchant_entity_type,
+                        merchant_incorporation_date,
+                        merchant_state_of_incorporation,
+                        row_version,
+                        created_at,
+                        updated_at
+                    FROM underwriting
+                    WHERE id = %s
+                """,
+                    (underwriting_id,),
+                )
 
-            underwriting_data = dict(uw)
+                underwriting_data = cursor.fetchone()
 
-            # Get owners with addresses
-            owners_with_addresses = self._get_owners_with_addresses(
-                underwriting_id, cursor
-            )
+                if not underwriting_data:
+                    return None
 
-            # Get merchant address
-            merchant_address = self._get_merchant_address(underwriting_id, cursor)
+                # Get owners with addresses
+                owners_with_addresses = self._get_owners_with_addresses(
+                    underwriting_id, cursor
+                )
 
-            # Get documents
-            documents = self._get_documents(underwriting_id, cursor)
+                # Get merchant address
+                merchant_address = self._get_merchant_address(underwriting_id, cursor)
 
-            # Extract merchant details from underwriting columns (not application_form)
-            merchant_details = self._build_merchant_details_from_columns(
-                underwriting_data, merchant_address
-            )
+                # Get documents
+                documents = self._get_documents(underwriting_id, cursor)
 
-            cursor.close()
+                # Extract merchant details from underwriting columns (not application_form)
+                merchant_details = self._build_merchant_details_from_columns(
+                    underwriting_data, merchant_address
+                )
 
             # Build complete underwriting object
             return {
@@ -553,13 +908,14 @@ class UnderwritingRepository:
                 "purpose": underwriting_data["purpose"],
                 "merchant": merchant_details,
                 "owners": owners_with_addresses,
+                "row_version": underwriting_data["row_version"],
                 "documents": documents,
                 "created_at": str(underwriting_data["created_at"]),
                 "updated_at": str(underwriting_data["updated_at"]),
             }
 
-        except Exception as e:
-            print(f"Error fetching underwriting details: {e}")
+        except Exception:
+            logger.exception("Error fetching underwriting details")
             return None
 
     def _get_documents(self, underwriting_id: str, cursor) -> list[dict[str, Any]]:
@@ -595,11 +951,10 @@ class UnderwritingRepository:
                 (underwriting_id,),
             )
 
-            documents = cursor.fetchall()
-            return [dict(doc) for doc in documents]
+            return cursor.fetchall()
 
-        except Exception as e:
-            print(f"Error fetching documents: {e}")
+        except Exception:
+            logger.exception("Error fetching documents")
             return []
 
     def list_all_underwritings(self) -> list[dict[str, Any]]:
@@ -610,10 +965,33 @@ class UnderwritingRepository:
             List of underwritings with merchant, owners, and addresses
         """
         try:
-            cursor = self.db.cursor()
+            return list(self.iter_all_underwritings())
 
-            # Get all underwritings
-            cursor.execute(
+        except Exception:
+            logger.exception("Error listing underwritings")
+            return []
+
+    def iter_all_underwritings(self, batch_size: int = 500) -> Iterator[dict[str, Any]]:
+        """
+        Stream all underwritings with complete details.
+
+        Underwritings are read from a server-side cursor batch_size rows at a
+        time; owners and merchant addresses are bulk-loaded once per batch.
+        The cursor stays open until the iterator is exhausted or closed.
+
+        Args:
+            batch_size: Underwritings fetched per round trip
+
+        Yields:
+            Underwritings with merchant, owners, and addresses, newest first
+        """
+        stream = self.db.cursor(
+            name=f"underwritings_{uuid.uuid4().hex}", cursor_factory=RealDictCursor
+        )
+        # Detail lookups run on a separate cursor; the named one only streams
+        cursor = self.db.cursor(cursor_factory=RealDictCursor)
+        try:
+            stream.execute(
                 """
                 SELECT
                     id,
@@ -635,6 +1013,7 @@ class UnderwritingRepository:
                     merchant_entity_type,
                     merchant_incorporation_date,
                     merchant_state_of_incorporation,
+                    row_version,
                     created_at,
                     updated_at
                 FROM underwriting
@@ -642,59 +1021,65 @@ class UnderwritingRepository:
             """
             )
 
-            underwritings = cursor.fetchall()
+            while True:
+                underwritings = stream.fetchmany(batch_size)
+                if not underwritings:
+                    break
 
-            # For each underwriting, get owners and addresses
-            result = []
-            for uw in underwritings:
-                underwriting_data = dict(uw)
+                underwriting_ids = [uw["id"] for uw in underwritings]
 
-                # Get owners with addresses
-                owners_with_addresses = self._get_owners_with_addresses(
-                    uw["id"], cursor
+                # Load owners and merchant addresses for the whole batch at once
+                owners_by_underwriting = (
+                    self._get_owners_with_addresses_by_underwriting(
+                        underwriting_ids, cursor
+                    )
                 )
-
-                # Get merchant address
-                merchant_address = self._get_merchant_address(uw["id"], cursor)
-
-                # Build merchant details from columns
-                merchant_details = self._build_merchant_details_from_columns(
-                    underwriting_data, merchant_address
+                merchant_address_by_underwriting = (
+                    self._get_merchant_addresses_by_underwriting(
+                        underwriting_ids, cursor
+                    )
                 )
 
-                # Build complete underwriting object
-                complete_underwriting = {
-                    "id": underwriting_data["id"],
-                    "organization_id": underwriting_data["organization_id"],
-                    "serial_number": underwriting_data["serial_number"],
-                    "status": underwriting_data["status"],
-                    "application_type": underwriting_data["application_type"],
-                    "application_ref_id": underwriting_data["application_ref_id"],
-                    "request_amount": (
-                        float(underwriting_data["request_amount"])
-                        if underwriting_data["request_amount"]
-                        else None
-                    ),
-                    "request_date": (
-                        str(underwriting_data["request_date"])
-                        if underwriting_data["request_date"]
-                        else None
-                    ),
-                    "purpose": underwriting_data["purpose"],
-                    "merchant": merchant_details,
-                    "owners": owners_with_addresses,
-                    "created_at": str(underwriting_data["created_at"]),
-                    "updated_at": str(underwriting_data["updated_at"]),
-                }
+                for underwriting_data in underwritings:
+                    underwriting_id = underwriting_data["id"]
+                    owners_with_addresses = owners_by_underwriting[underwriting_id]
+                    merchant_address = merchant_address_by_underwriting.get(
+                        underwriting_id
+                    )
 
-                result.append(complete_underwriting)
+                    # Build merchant details from columns
+                    merchant_details = self._build_merchant_details_from_columns(
+                        underwriting_data, merchant_address
+                    )
 
+                    # Build complete underwriting object
+                    yield {
+                        "id": underwriting_data["id"],
+                        "organization_id": underwriting_data["organization_id"],
+                        "serial_number": underwriting_data["serial_number"],
+                        "status": underwriting_data["status"],
+                        "application_type": underwriting_data["application_type"],
+                        "application_ref_id": underwriting_data["application_ref_id"],
+                        "request_amount": (
+                            float(underwriting_data["request_amount"])
+                            if underwriting_data["request_amount"]
+                            else None
+                        ),
+                        "request_date": (
+                            str(underwriting_data["request_date"])
+                            if underwriting_data["request_date"]
+                            else None
+                        ),
+                        "purpose": underwriting_data["purpose"],
+                        "merchant": merchant_details,
+                        "owners": owners_with_addresses,
+                        "row_version": underwriting_data["row_version"],
+                        "created_at": str(underwriting_data["created_at"]),
+                        "updated_at": str(underwriting_data["updated_at"]),
+                    }
+        finally:
             cursor.close()
-            return result
-
-        except Exception as e:
-            print(f"Error listing underwritings: {e}")
-            return []
+            stream.close()
 
     # =========================================================================
     # PRIVATE HELPER METHODS
@@ -703,63 +1088,43 @@ class UnderwritingRepository:
     def _get_owners_with_addresses(
         self, underwriting_id: str, cursor: Any
     ) -> list[dict[str, Any]]:
-        """Get owners with their addresses for an underwriting."""
-        # Get owners
+        """Get owners with their addresses for an underwriting in one query."""
         cursor.execute(
-            """
-            SELECT
-                id as owner_id,
-                first_name,
-                last_name,
-                email,
-                phone_mobile,
-                phone_home,
-                phone_work,
-                birthday,
-                fico_score,
-                ssn,
-                ownership_percent,
-                primary_owner,
-                enabled,
-                created_at,
-                updated_at
-            FROM owner
-            WHERE underwriting_id = %s AND enabled = true
-            ORDER BY primary_owner DESC, first_name
+            _OWNERS_WITH_ADDRESS_SELECT
+            + """
+            WHERE o.underwriting_id = %s AND o.enabled = true
+            ORDER BY o.primary_owner DESC, o.first_name
         """,
             (underwriting_id,),
         )
 
-        owners = cursor.fetchall()
+        return [_owner_with_address(row) for row in cursor.fetchall()]
 
-        # Get addresses for each owner
-        owners_with_addresses = []
-        for owner in owners:
-            owner_data = dict(owner)
+    def _get_owners_with_addresses_by_underwriting(
+        self, underwriting_ids: list[str], cursor: Any
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Get owners with addresses for many underwritings, keyed by underwriting."""
+        owners_by_underwriting: dict[str, list[dict[str, Any]]] = {
+            underwriting_id: [] for underwriting_id in underwriting_ids
+        }
+        if not underwriting_ids:
+            return owners_by_underwriting
 
-            # Get address
-            cursor.execute(
-                """
-                SELECT
-                    id,
-                    addr_1,
-                    addr_2,
-                    city,
-                    state,
-                    zip,
-                    created_at,
-                    updated_at
-                FROM owner_address
-                WHERE owner_id = %s
-            """,
-                (owner["owner_id"],),
-            )
+        cursor.execute(
+            _OWNERS_WITH_ADDRESS_SELECT
+            + """
+            WHERE o.underwriting_id = ANY(%s::uuid[]) AND o.enabled = true
+            ORDER BY o.underwriting_id, o.primary_owner DESC, o.first_name
+        """,
+            (underwriting_ids,),
+        )
 
-            address = cursor.fetchone()
-            owner_data["address"] = dict(address) if address else None
-            owners_with_addresses.append(owner_data)
+        for row in cursor.fetchall():
+            owners_by_underwriting[row["underwriting_id"]].append(
+                _owner_with_address(row)
+            )
 
-        return owners_with_addresses
+        return owners_by_underwriting
 
     def _get_merchant_address(
         self, underwriting_id: str, cursor: Any
@@ -782,8 +1147,38 @@ class UnderwritingRepository:
             (underwriting_id,),
         )
 
-        address = cursor.fetchone()
-        return dict(address) if address else None
+        return cursor.fetchone()
+
+    def _get_merchant_addresses_by_underwriting(
+        self, underwriting_ids: list[str], cursor: Any
+    ) -> dict[str, dict[str, Any]]:
+        """Get merchant addresses for many underwritings, keyed by underwriting."""
+        if not underwriting_ids:
+            return {}
+
+        cursor.execute(
+            """
+            SELECT DISTINCT ON (underwriting_id)
+                underwriting_id,
+                id,
+                addr_1,
+                addr_2,
+                city,
+                state,
+                zip,
+                created_at,
+                updated_at
+            FROM merchant_address
+            WHERE underwriting_id = ANY(%s::uuid[])
+            ORDER BY underwriting_id
+        """,
+            (underwriting_ids,),
+        )
+
+        addresses = {}
+        for row in cursor.fetchall():
+            addresses[row.pop("underwriting_id")] = row
+        return addresses
 
     def _build_merchant_details_from_columns(
         self,
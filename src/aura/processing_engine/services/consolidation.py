@@ -4,6 +4,7 @@ Consolidation Service
 Plain function for factor consolidation across processor executions.
 """
 
+import logging
 from typing import Any
 
 from ..repositories import (
@@ -11,9 +12,10 @@ from ..repositories import (
     ExecutionRepository,
     FactorRepository,
 )
+from .database import pooled_connection
 from .registry import get_registry
-import psycopg2
-from psycopg2.extras import RealDictCursor
+
+logger = logging.getLogger(__name__)
 
 
 def consolidation(
@@ -23,10 +25,10 @@ def consolidation(
     Consolidate execution results for multiple processors.
 
     Steps:
-    1. For each processor in list
-    2. Get active executions for processor
+    1. Load processor configs and active executions for the whole list
+    2. For each processor in list
     3. Run processor's consolidate method
-    4. Update factors in database
+    4. Update factors in database for all processors in one transaction
 
     Args:
         processor_list: List of underwriting_processor_ids to consolidate
@@ -34,132 +36,144 @@ def consolidation(
     Returns:
         Consolidation results with counts
     """
-    # Get database connection
-    db_connection = psycopg2.connect(
-        host="localhost",
-        port=5432,
-        database="aura_underwriting",
-        user="aura_user",
-        password="aura_password",
-        cursor_factory=RealDictCursor,
-    )
-
-    # Instantiate repositories and set database connection
-    processor_repo = ProcessorRepository()
-    processor_repo.__init__(db_connection)
-
-    execution_repo = ExecutionRepository()
-    execution_repo.__init__(db_connection)
-
-    factor_repo = FactorRepository()
-    factor_repo.__init__(db_connection)
-
-    results = []
-
-    for underwriting_processor_id in processor_list:
-        print(f"  Consolidating: {underwriting_processor_id}")
-
-        try:
-            processor_config = processor_repo.get_underwriting_processor_by_id(
-                underwriting_processor_id
-            )
+    # Borrow a pooled connection rather than connecting on every call
+    with pooled_connection() as db_connection:
+        # Repositories bound to the borrowed connection; the shared
+        # singletons keep their own connection
+        processor_repo = ProcessorRepository.bound(db_connection)
+        execution_repo = ExecutionRepository.bound(db_connection)
+        factor_repo = FactorRepository(db_connection)
+
+        results = []
+        # Factor saves, with the result each one belongs to, written after the loop
+        pending_saves: list[tuple[dict[str, Any], dict[str, Any]]] = []
+
+        # Two queries for the whole list instead of two per processor
+        processor_configs = processor_repo.get_underwriting_processors_by_ids(
+            processor_list
+        )
+        executions_by_processor = execution_repo.get_active_executions_for_processors(
+            processor_list
+        )
+
+        # Resolve each distinct processor class once rather than per entry
+        processor_registry = get_registry()
+        processor_classes = {
+            name: processor_registry.get_processor(name)
+            for name in {config["processor"] for config in processor_configs.values()}
+            if processor_registry.is_processor_registered(name)
+        }
+
+        for underwriting_processor_id in processor_list:
+            logger.debug("Consolidating %s", underwriting_processor_id)
+
+            processor_config = processor_configs.get(underwriting_processor_id)
 
             if not processor_config:
-                print("    ⚠️  Processor config not found")
+                logger.warning(
+                    "Processor config not found: %s", underwriting_processor_id
+                )
                 continue
 
-            active_executions = execution_repo.get_active_executions(
-                underwriting_processor_id=underwriting_processor_id
+            processor_name = processor_config["processor"]
+
+            active_executions = executions_by_processor.get(
+                underwriting_processor_id, []
             )
+            logger.debug("Active executions: %d", len(active_executions))
 
-            # Handle None active_executions
-            if active_executions is None:
-                active_executions = []
-                print("    ⚠️  No active executions found (None returned)")
-            else:
-                print(f"    Active executions: {len(active_executions)}")
-
-            processor_registry = get_registry()
-            if not processor_registry.is_processor_registered(
-                processor_config["processor"]
-            ):
-                print(
-                    f"    ⚠️  Processor not registered: {processor_config['processor']}"
-                )
+            processor_class = processor_classes.get(processor_name)
+            if processor_class is None:
+                logger.warning("Processor not registered: %s", processor_name)
                 continue
 
-            processor_class = processor_registry.get_processor(
-                processor_config["processor"]
-            )
-
-            # Extract factors from each execution's factors_delta
-            factors_list: list[dict[str, Any]] = []
-            for execution in active_executions:
-                # Handle None execution
-                if execution is None:
-                    print("    ⚠️  Found None execution, skipping")
-                    continue
+            # Only the parts that touch stored execution output or processor
+            # code can fail; the lookups above work on already-loaded dicts
+            try:
+                # Extract factors from each execution's factors_delta, treating
+                # a missing or NULL factors_delta or factors as empty. The rows
+                # come straight from the repository, so none is None.
+                # consolidate() indexes into the list, so it stays a list
+                factors_list: list[dict[str, Any]] = [
+                    (execution.get("factors_delta") or {}).get("factors") or {}
+                    for execution in active_executions
+                ]
+
+                # Nothing to consolidate when no execution produced factors;
+                # skip the processor's consolidate() and the factor write
+                consolidated_factors = (
+                    processor_class.consolidate(factors_list)
+                    if any(factors_list)
+                    else {}
+                )
 
-                # Handle None factors_delta safely
-                factors_delta = execution.get("factors_delta", {}) if execution else {}
-                if factors_delta is None:
-                    factors_delta = {}
+            except Exception as e:
+                logger.exception("Consolidation failed: %s", underwriting_processor_id)
 
-                factors = factors_delta.get("factors", {}) if factors_delta else {}
-                factors_list.append(factors)
+                results.append(
+                    {
+                        "success": False,
+                        "underwriting_processor_id": underwriting_processor_id,
+                        "error": str(e),
+                    }
+                )
+                continue
 
-            consolidated_factors = processor_class.consolidate(factors_list)
+            logger.debug("Consolidated: %s", consolidated_factors)
 
-            print(f"    ✅ Consolidated: {consolidated_factors}")
+            result = {
+                "success": True,
+                "underwriting_processor_id": underwriting_processor_id,
+                "processor": processor_name,
+                "factors": consolidated_factors,
+                "execution_count": len(active_executions),
+            }
+            results.append(result)
 
-            # Save factors to database
+            # Stage factors for the database
             if consolidated_factors:
 
-                # Get the latest execution_id for lineage tracking
-                latest_execution_id = None
-                if active_executions and len(active_executions) > 0:
-                    first_execution = active_executions[0]
-                    if first_execution is not None:
-                        latest_execution_id = first_execution.get("id")
-
-                success = factor_repo.save_factors(
-                    organization_id=processor_config.get("organization_id"),
-                    underwriting_id=processor_config.get("underwriting_id"),
-                    underwriting_processor_id=underwriting_processor_id,
-                    execution_id=latest_execution_id,
-                    factors=consolidated_factors,
-                    source="processor",
+                # Latest execution_id for lineage tracking (newest first)
+                latest_execution_id = (
+                    active_executions[0].get("id") if active_executions else None
                 )
 
-                if success:
-                    print(
-                        f"    💾 Saved {len(consolidated_factors)} factors to database"
+                pending_saves.append(
+                    (
+                        result,
+                        {
+                            "organization_id": processor_config["organization_id"],
+                            "underwriting_id": processor_config["underwriting_id"],
+                            "underwriting_processor_id": underwriting_processor_id,
+                            "execution_id": latest_execution_id,
+                            "factors": consolidated_factors,
+                            "source": "processor",
+                        },
                     )
-                else:
-                    print("    ❌ Failed to save factors to database")
-
-            results.append(
-                {
-                    "success": True,
-                    "underwriting_processor_id": underwriting_processor_id,
-                    "processor": processor_config["processor"],
-                    "factors": consolidated_factors,
-                    "execution_count": len(active_executions),
-                }
-            )
+                )
+
+            logger.debug("Factors to save: %s", list(consolidated_factors))
 
-            print(f"    Factors to save: {list(consolidated_factors.keys())}")
+        # Save factors to database: one batched upsert and one commit for all
+        # processors; a failure rolls every save back
+        if pending_saves:
+            try:
+                changed = factor_repo.save_factors_bulk(
+                    [save for _, save in pending_saves]
+                )
+
+                logger.info(
+                    "Saved factors for %d processors (%d changed)",
+                    len(pending_saves),
+                    len(changed),
+                )
 
-        except Exception as e:
-            print(f"    ❌ Consolidation failed: {e}")
+            except Exception as e:
+                logger.exception("Failed to save factors to database")
 
-            results.append(
-                {
-                    "success": False,
-                    "underwriting_processor_id": underwriting_processor_id,
-                    "error": str(e),
-                }
-            )
+                for result, _ in pending_saves:
+                    result["success"] = False
+                    result["error"] = str(e)
 
     consolidated = sum(1 for r in results if r.get("success"))
 
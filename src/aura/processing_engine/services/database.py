@@ -0,0 +1,97 @@
+"""
+Database Connection Pool
+
+Process-wide psycopg2 connection pool shared by the service functions, so a
+consolidation or execution run borrows an open connection instead of paying
+a fresh connect (TCP, TLS and auth handshake) on every call.
+
+Connection settings come from the POSTGRES_* environment variables used by
+the rest of the project; AURA_DB_POOL_MIN / AURA_DB_POOL_MAX size the pool
+and AURA_EXEC_WORKERS sets how many of its connections execution runs use.
+"""
+
+from contextlib import contextmanager
+import os
+import threading
+from typing import Any, Iterator, Optional
+
+from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
+
+POOL_MAX = int(os.getenv("AURA_DB_POOL_MAX", "16"))
+
+# Upper bound on parallel executions per run. Processors mostly wait on the
+# database and external services, so the default oversubscribes the CPUs.
+# Each execution worker holds its own pooled connection, so the count is
+# capped at the pool size less two connections left for other service calls.
+EXEC_WORKERS = max(
+    1,
+    min(
+        int(os.getenv("AURA_EXEC_WORKERS", str((os.cpu_count() or 2) * 4))),
+        POOL_MAX - 2,
+    ),
+)
+
+# Connections the pool keeps open while idle. putconn() closes a returned
+# connection once POOL_MIN are idle, so the default covers the execution
+# workers plus the other service calls; a smaller pool would reconnect (and
+# lose its prepared statements) on every run. All POOL_MIN connections are
+# opened when the pool is created.
+POOL_MIN = min(int(os.getenv("AURA_DB_POOL_MIN", str(EXEC_WORKERS + 2))), POOL_MAX)
+
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_lock = threading.Lock()
+
+# One slot per pooled connection. getconn() raises PoolError as soon as
+# POOL_MAX connections are out, so pooled_connection() takes a slot first and
+# concurrent callers (e.g. several workflows' execution workers) wait for a
+# connection to come back instead of failing
+_checkout_slots = threading.BoundedSemaphore(POOL_MAX)
+
+
+def get_pool() -> ThreadedConnectionPool:
+    """
+    Return the shared connection pool, creating it on first use.
+
+    Created lazily rather than at import so importing the services does not
+    require a reachable database.
+
+    Returns:
+        Thread-safe psycopg2 connection pool
+    """
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadedConnectionPool(
+                    minconn=POOL_MIN,
+                    maxconn=POOL_MAX,
+                    host=os.getenv("POSTGRES_HOST", "localhost"),
+                    port=int(os.getenv("POSTGRES_PORT", "5432")),
+                    database=os.getenv("POSTGRES_DB", "aura_underwriting"),
+                    user=os.getenv("POSTGRES_USER", "aura_user"),
+                    password=os.getenv("POSTGRES_PASSWORD", "aura_password"),
+                    cursor_factory=RealDictCursor,
+                )
+    return _pool
+
+
+@contextmanager
+def pooled_connection() -> Iterator[Any]:
+    """
+    Borrow a connection from the shared pool for the duration of the block.
+
+    Blocks while all POOL_MAX connections are checked out. Anything left
+    uncommitted is rolled back when the connection goes back to the pool.
+
+    Yields:
+        psycopg2 connection
+    """
+    with _checkout_slots:
+        pool = get_pool()
+        connection = pool.getconn()
+        try:
+            yield connection
+        finally:
+            pool.putconn(connection)
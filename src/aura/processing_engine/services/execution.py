@@ -6,6 +6,10 @@ status tracking, and result persistence.
 """
 
 import concurrent.futures
+import contextlib
+import logging
+import os
+import time
 from datetime import datetime
 from typing import Any, Optional
 
@@ -13,9 +17,24 @@ from ..repositories import (
     ProcessorRepository,
     ExecutionRepository,
 )
+from .database import EXEC_WORKERS, pooled_connection
 from .registry import get_registry
+from ..base_processor import BaseProcessor
 from ..models import ExecutionPayload
 
+logger = logging.getLogger(__name__)
+
+# Upper bound on parallel executions per run (AURA_EXEC_WORKERS, sized
+# against the pool in database.py); workers of concurrent runs that find the
+# pool in use wait in pooled_connection()
+_MAX_WORKERS = EXEC_WORKERS
+
+# Whether to write status='running' before a processor starts. The final
+# UPDATE records started_at either way; turning this off saves a round trip
+# per execution but leaves the row 'pending' while it runs, so only disable
+# it where no other dispatcher can pick the same execution up.
+_TRACK_RUNNING_STATUS = os.getenv("AURA_TRACK_RUNNING_STATUS", "true") == "true"
+
 
 def execution(
     execution_list: list[str],
@@ -38,104 +57,200 @@ def execution(
     if not execution_list:
         return {"completed": 0, "failed": 0, "results": []}
 
-    print(f"    🚀 Starting execution of {len(execution_list)} executions")
-    print(f"    📋 Execution IDs: {execution_list}")
-
-    # Instantiate repositories directly
-    execution_repo = ExecutionRepository()
+    logger.info("Starting execution of %d executions", len(execution_list))
+    logger.debug("Execution IDs: %s", execution_list)
 
     results = []
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+    # One query for every execution instead of one per ID, on a connection
+    # returned to the pool before the workers start
+    with pooled_connection() as db_connection:
+        executions = ExecutionRepository.bound(db_connection).get_executions_by_ids(
+            execution_list
+        )
+
+    # Resolve each distinct processor class once rather than per execution
+    processor_registry = get_registry()
+    processor_classes = {
+        name: processor_registry.get_processor(name)
+        for name in {exec_data["processor"] for exec_data in executions.values()}
+        if processor_registry.is_processor_registered(name)
+    }
+
+    max_workers = min(len(execution_list), _MAX_WORKERS)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
         futures = []
 
         for execution_id in execution_list:
-            exec_data = execution_repo.get_execution_by_id(execution_id)
+            exec_data = executions.get(str(execution_id))
 
             if not exec_data:
-                print(f"    ⚠️  Execution not found: {execution_id}")
+                logger.warning("Execution not found: %s", execution_id)
                 continue
 
             if exec_data["status"] in ["pending"]:
-                print(
-                    f"    🎯 Launching: {exec_data['processor']} (ID: {execution_id}, Status: {exec_data['status']})"
+                logger.debug(
+                    "Launching: %s (ID: %s)", exec_data["processor"], execution_id
                 )
                 future = executor.submit(
-                    run_execution,
+                    _run_pooled_execution,
                     execution=exec_data,
+                    processor_class=processor_classes.get(exec_data["processor"]),
                 )
                 futures.append(future)
             else:
-                print(
-                    f"    ⏭️  Skipping: {exec_data['processor']} (ID: {execution_id}, Status: {exec_data['status']})"
+                logger.debug(
+                    "Skipping: %s (ID: %s, Status: %s)",
+                    exec_data["processor"],
+                    execution_id,
+                    exec_data["status"],
                 )
 
-        print(f"    ⏳ Waiting for {len(futures)} executions to complete...")
+        logger.debug("Waiting for %d executions to complete", len(futures))
 
         for future in concurrent.futures.as_completed(futures):
             try:
                 result = future.result()
                 results.append(result)
             except Exception as e:
-                print(f"    ❌ Execution error: {e}")
+                logger.exception("Execution error")
                 results.append({"success": False, "error": str(e)})
 
     completed = sum(1 for r in results if r.get("success"))
-    failed = sum(1 for r in results if not r.get("success"))
+    failed = len(results) - completed
 
-    print(f"    📊 Execution Summary: {completed} completed, {failed} failed")
+    logger.info("Execution summary: %d completed, %d failed", completed, failed)
 
     return {"completed": completed, "failed": failed, "results": results}
 
 
+def _run_pooled_execution(
+    execution: dict[str, Any],
+    processor_class: Optional[type[BaseProcessor]] = None,
+) -> dict[str, Any]:
+    """Run one execution on its own pooled connection and repositories."""
+    with contextlib.ExitStack() as stack:
+        try:
+            db_connection = stack.enter_context(pooled_connection())
+        except Exception as e:
+            return _fail_unstarted_execution(execution, e)
+
+        return run_execution(
+            execution=execution,
+            processor_class=processor_class,
+            execution_repo=ExecutionRepository.bound(db_connection),
+            processor_repo=ProcessorRepository.bound(db_connection),
+        )
+
+
+def _fail_unstarted_execution(
+    execution: dict[str, Any], error: Exception
+) -> dict[str, Any]:
+    """
+    Mark an execution failed that never started for lack of a connection.
+
+    The status is written through the shared ExecutionRepository, so the row
+    does not stay 'pending' with nothing left to run it.
+
+    Args:
+        execution: Execution record that could not be run
+        error: Why no pooled connection could be obtained
+
+    Returns:
+        Execution result
+    """
+    execution_id = execution["id"]
+    processor_name = execution["processor"]
+    logger.error(
+        "No database connection for %s (Execution: %s): %s",
+        processor_name,
+        execution_id,
+        error,
+    )
+
+    ExecutionRepository().update_execution_status(
+        execution_id=execution_id,
+        status="failed",
+        completed_at=datetime.now(),
+        failed_reason=f"No database connection: {error}",
+    )
+
+    return {
+        "success": False,
+        "execution_id": execution_id,
+        "processor": processor_name,
+        "error": str(error),
+        "duration_seconds": 0.0,
+    }
+
+
 def run_execution(
     execution: dict[str, Any],
+    processor_class: Optional[type[BaseProcessor]] = None,
+    execution_repo: Optional[ExecutionRepository] = None,
+    processor_repo: Optional[ProcessorRepository] = None,
 ) -> dict[str, Any]:
     """
     Run a single processor execution.
 
     Args:
         execution: Execution record with processor, payload, etc.
+        processor_class: Processor class already resolved by the caller;
+            looked up in the registry when omitted
+        execution_repo: Execution repository to use; the shared singleton
+            when omitted
+        processor_repo: Processor repository to use; the shared singleton
+            when omitted
 
     Returns:
         Execution result
     """
-    # Instantiate repositories directly
-    execution_repo = ExecutionRepository()
-    processor_repo = ProcessorRepository()
+    if execution_repo is None:
+        execution_repo = ExecutionRepository()
+    if processor_repo is None:
+        processor_repo = ProcessorRepository()
 
+    # Wall-clock start for started_at; durations use the monotonic clock
     step_start = datetime.now()
+    step_t0 = time.monotonic()
     execution_id = execution["id"]
     processor_name = execution["processor"]
     underwriting_processor_id = execution["underwriting_processor_id"]
     underwriting_id = execution["underwriting_id"]
 
-    print(f"    🔄 Running: {processor_name} (Execution: {execution_id[:8]}...)")
-    print(f"        📍 Underwriting: {underwriting_id}")
-    print(f"        🔗 Processor ID: {underwriting_processor_id}")
+    logger.debug(
+        "Running: %s (Execution: %s, Underwriting: %s, Processor ID: %s)",
+        processor_name,
+        execution_id,
+        underwriting_id,
+        underwriting_processor_id,
+    )
 
     try:
-        execution_repo.update_execution_status(
-            execution_id=execution_id, status="running", started_at=datetime.now()
-        )
+        if _TRACK_RUNNING_STATUS:
+            execution_repo.update_execution_status(
+                execution_id=execution_id, status="running", started_at=step_start
+            )
+
+        if processor_class is None:
+            processor_registry = get_registry()
+            if not processor_registry.is_processor_registered(processor_name):
+                raise Exception(f"Processor not registered: {processor_name}")
 
-        processor_registry = get_registry()
-        if not processor_registry.is_processor_registered(processor_name):
-            raise Exception(f"Processor not registered: {processor_name}")
+            processor_class = processor_registry.get_processor(processor_name)
 
-        processor_class = processor_registry.get_processor(processor_name)
         processor = processor_class(processor_repo=processor_repo)
         processor._underwriting_processor_id = underwriting_processor_id
 
         payload_data = execution["payload"]
 
-        # Log payload information
         if isinstance(payload_data, dict):
-            app_form_keys = list(payload_data.get("application_form", {}).keys())
-            docs_count = len(payload_data.get("documents_list", []))
-            owners_count = len(payload_data.get("owners_list", []))
-            print(
-                f"        📦 Payload: {len(app_form_keys)} app fields, {docs_count} docs, {owners_count} owners"
+            logger.debug(
+                "Payload: %d app fields, %d docs, %d owners",
+                len(payload_data.get("application_form", {})),
+                len(payload_data.get("documents_list", [])),
+                len(payload_data.get("owners_list", [])),
             )
 
             exec_payload = ExecutionPayload(
@@ -145,12 +260,10 @@ def run_execution(
                 owners_list=payload_data.get("owners_list", []),
                 documents_list=payload_data.get("documents_list", []),
                 revision_ids=payload_data.get("revision_id"),
+                revision_id=payload_data.get("revision_id"),
             )
-
-            if "revision_id" in payload_data:
-                exec_payload.revision_id = payload_data["revision_id"]
         else:
-            print(f"        📦 Payload: {type(payload_data).__name__}")
+            logger.debug("Payload: %s", type(payload_data).__name__)
             exec_payload = payload_data
 
         result = processor.execute(
@@ -166,21 +279,16 @@ def run_execution(
                 factors={},
                 cost_cents=int(result.total_cost_cents),
                 completed_at=datetime.now(),
+                started_at=step_start,
             )
 
-            duration = (datetime.now() - step_start).total_seconds()
-            output_keys = (
-                list(result.output.keys()) if isinstance(result.output, dict) else "N/A"
-            )
-            cost_dollars = (
-                result.total_cost_cents / 100 if result.total_cost_cents else 0
-            )
-
-            print(
-                f"    ✅ Completed: {processor_name} ({duration:.2f}s, ${cost_dollars:.2f})"
-            )
-            print(
-                f"        📊 Output: {len(output_keys) if isinstance(output_keys, list) else 'N/A'} factors"
+            duration = time.monotonic() - step_t0
+            logger.info(
+                "Completed: %s (%.2fs, $%.2f, %s factors)",
+                processor_name,
+                duration,
+                (result.total_cost_cents or 0) / 100,
+                len(result.output) if isinstance(result.output, dict) else "N/A",
             )
 
             return {
@@ -195,13 +303,18 @@ def run_execution(
             execution_repo.update_execution_status(
                 execution_id=execution_id,
                 status="failed",
+                started_at=step_start,
                 completed_at=datetime.now(),
                 failed_reason=result.error_message,
             )
 
-            duration = (datetime.now() - step_start).total_seconds()
-            print(f"    ❌ Failed: {processor_name} ({duration:.2f}s)")
-            print(f"        💥 Error: {result.error_message}")
+            duration = time.monotonic() - step_t0
+            logger.warning(
+                "Failed: %s (%.2fs): %s",
+                processor_name,
+                duration,
+                result.error_message,
+            )
 
             return {
                 "success": False,
@@ -215,13 +328,13 @@ def run_execution(
         execution_repo.update_execution_status(
             execution_id=execution_id,
             status="failed",
+            started_at=step_start,
             completed_at=datetime.now(),
             failed_reason=str(e),
         )
 
-        duration = (datetime.now() - step_start).total_seconds()
-        print(f"    💥 Exception: {processor_name} ({duration:.2f}s)")
-        print(f"        🔥 Error: {str(e)}")
+        duration = time.monotonic() - step_t0
+        logger.exception("Exception: %s (%.2fs)", processor_name, duration)
 
         return {
             "success": False,
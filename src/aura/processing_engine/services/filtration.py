@@ -4,6 +4,7 @@ Filtration Service
 Plain functions for processor filtration, selection, and execution generation.
 """
 
+import logging
 from typing import Any, Optional
 
 from ..repositories import (
@@ -13,7 +14,9 @@ from ..repositories import (
 )
 from ..utils.payload import format_payload_list as format_payload_list_util
 from ..utils.hashing import generate_payload_hash
-from .registry import get_registry
+from .registry import resolve_processor
+
+logger = logging.getLogger(__name__)
 
 
 def filtration(
@@ -40,38 +43,46 @@ def filtration(
     underwriting = underwriting_repo.get_underwriting_with_details(underwriting_id)
 
     if not underwriting:
-        print(f"  ⚠️  Underwriting not found: {underwriting_id}")
+        logger.warning("Underwriting not found: %s", underwriting_id)
         return {"processor_list": [], "execution_list": [], "eligible_processors": []}
 
     processors = processor_repo.get_underwriting_processors(
         underwriting_id=underwriting_id, enabled_only=True, auto_only=True
     )
 
-    print(f"  Found {len(processors)} eligible processors")
+    logger.info("Found %d eligible processors", len(processors))
 
     processor_list = []
     execution_list = []
 
+    # Active executions for every processor in one query instead of one each
+    active_executions = ExecutionRepository().get_active_executions_for_processors(
+        [processor_config["id"] for processor_config in processors]
+    )
+
     for processor_config in processors:
-        print(f"  Checking processor: {processor_config['processor']}")
+        logger.debug("Checking processor: %s", processor_config["processor"])
 
         preparation = prepare_processor(
             underwriting_processor_id=processor_config["id"],
             underwriting_data=underwriting,
             processor_config=processor_config,
+            current_execution_ids=[
+                ex["id"] for ex in active_executions.get(processor_config["id"], [])
+            ],
         )
 
         if preparation is None:
-            print("    ℹ️  No triggers matched - skipped")
+            logger.debug("No triggers matched - skipped")
         elif isinstance(preparation, list):
             if len(preparation) == 0:
-                print("    ✅ Triggers matched, no new executions needed")
-                if len(processor_config.get("current_executions_list", [])) > 0:
-                    print(
-                        f"       Skipped {len(processor_config.get('current_executions_list', []))} existing execution(s) (already completed)"
-                    )
+                logger.debug(
+                    "Triggers matched, no new executions needed "
+                    "(%d existing execution(s) kept)",
+                    len(processor_config.get("current_executions_list") or []),
+                )
             else:
-                print(f"    ✅ Triggers matched, {len(preparation)} new execution(s)")
+                logger.debug("Triggers matched, %d new execution(s)", len(preparation))
 
             processor_list.append(processor_config["id"])
             execution_list.extend(preparation)
@@ -87,6 +98,7 @@ def prepare_processor(
     underwriting_data: dict[str, Any],
     processor_config: dict[str, Any],
     duplicate: bool = False,
+    current_execution_ids: Optional[list[str]] = None,
 ) -> Optional[list[str]]:
     """
     Preparation: Determine if processor should participate.
@@ -102,26 +114,29 @@ def prepare_processor(
         underwriting_data: Complete underwriting data
         processor_config: Processor configuration dict
         duplicate: Allow duplicate executions
+        current_execution_ids: IDs of the processor's active executions when
+            the caller already loaded them; queried here when omitted
 
     Returns:
         List of execution IDs to run, empty list if triggers matched but no new executions,
         or None if no triggers matched
     """
-
-    registry = get_registry()
-    processor_class = registry.get_processor(processor_config["processor"])
+    _, processor_type, processor_triggers = resolve_processor(
+        processor_config["processor"]
+    )
     payload_list = format_payload_list_util(
-        processor_type=processor_class.PROCESSOR_TYPE,
-        processor_triggers=processor_class.PROCESSOR_TRIGGERS,
+        processor_type=processor_type,
+        processor_triggers=processor_triggers,
         underwriting_data=underwriting_data,
     )
-    print(f"    ℹ️  Payload list: {payload_list}")
+    logger.debug("Payload list: %s", payload_list)
 
     if payload_list is None:
         return None
 
-    if not payload_list:
-        # Check if there are existing executions to remove
+    # Generating executions never changes this set: new executions start
+    # 'pending' and active ones are completed or failed
+    if current_execution_ids is None:
         current_execution_ids = [
             ex["id"]
             for ex in ExecutionRepository().get_active_executions(
@@ -129,42 +144,64 @@ def prepare_processor(
             )
         ]
 
+    if not payload_list:
         if current_execution_ids:
             # Remove existing executions since no new ones are needed
             ProcessorRepository().update_current_executions_list(
                 underwriting_processor_id=underwriting_processor_id,
                 execution_ids=[],  # Empty list removes all current executions
             )
-            print(f"    ℹ️  Removing {len(current_execution_ids)} existing executions")
+            logger.debug("Removing %d existing executions", len(current_execution_ids))
 
         # Return empty list to include in processor_list but skip execution
         # This means: triggers are configured but no data is available
         return []
 
-    print(f"    ℹ️  Generating {len(payload_list)} executions")
+    logger.debug("Generating %d executions", len(payload_list))
 
-    execution_list = [
-        generate_execution(
+    # Same create-or-reuse rule as generate_execution, with every payload's
+    # existing execution resolved in one lookup instead of one per payload
+    payload_hashes = [
+        generate_payload_hash(payload, processor_triggers) for payload in payload_list
+    ]
+    existing_by_hash = (
+        {}
+        if duplicate
+        else ExecutionRepository().find_execution_ids_by_hashes(
+            underwriting_processor_id, payload_hashes
+        )
+    )
+
+    execution_list = []
+    for payload, payload_hash in zip(payload_list, payload_hashes):
+        existing_id = existing_by_hash.get(payload_hash)
+        if existing_id:
+            execution_list.append(existing_id)
+            continue
+
+        execution_id = _create_execution(
             underwriting_processor_id=underwriting_processor_id,
             payload=payload,
+            payload_hash=payload_hash,
             processor_config=processor_config,
-            processor_triggers=processor_class.PROCESSOR_TRIGGERS,
-            duplicate=duplicate,
         )
-        for payload in payload_list
-    ]
-
-    current_execution_ids = [
-        ex["id"]
-        for ex in ExecutionRepository().get_active_executions(underwriting_processor_id)
-    ]
-
-    new_exe_list = [eid for eid in execution_list if eid not in current_execution_ids]
-    del_exe_list = [eid for eid in current_execution_ids if eid not in execution_list]
-
-    print(f"    ℹ️  Existing execution list: {current_execution_ids}")
-    print(f"    ℹ️  New execution list: {new_exe_list}")
-    print(f"    ℹ️  Deleted execution list: {del_exe_list}")
+        execution_list.append(execution_id)
+        if not duplicate:
+            # Identical payloads later in the list reuse this execution
+            existing_by_hash[payload_hash] = execution_id
+
+    # Set membership keeps the diff linear; the lists keep their order
+    current_execution_set = set(current_execution_ids)
+    execution_set = set(execution_list)
+    new_exe_list = [eid for eid in execution_list if eid not in current_execution_set]
+    del_exe_list = [eid for eid in current_execution_ids if eid not in execution_set]
+
+    logger.debug(
+        "Executions: existing %s, new %s, deleted %s",
+        current_execution_ids,
+        new_exe_list,
+        del_exe_list,
+    )
 
     if not new_exe_list and not del_exe_list:
         return []
@@ -208,15 +245,29 @@ def generate_execution(
 
     payload_hash = generate_payload_hash(payload, processor_triggers)
 
-    existing = execution_repo.find_execution_by_hash(
+    existing_id = execution_repo.find_execution_id_by_hash(
         underwriting_processor_id, payload_hash
     )
 
-    if existing and not duplicate:
-        execution_id = existing["id"]
-        return execution_id
+    if existing_id and not duplicate:
+        return existing_id
 
-    execution_id = execution_repo.create_execution(
+    return _create_execution(
+        underwriting_processor_id=underwriting_processor_id,
+        payload=payload,
+        payload_hash=payload_hash,
+        processor_config=processor_config,
+    )
+
+
+def _create_execution(
+    underwriting_processor_id: str,
+    payload: dict[str, Any],
+    payload_hash: str,
+    processor_config: dict[str, Any],
+) -> str:
+    """Create a new execution for an already-hashed payload."""
+    return ExecutionRepository().create_execution(
         underwriting_id=processor_config.get(
             "underwriting_id", "placeholder_underwriting_id"
         ),
@@ -228,5 +279,3 @@ def generate_execution(
         payload=payload,
         payload_hash=payload_hash,
     )
-
-    return execution_id
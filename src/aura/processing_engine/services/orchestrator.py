@@ -613,14 +613,9 @@ def create_orchestrator(db_connection: Any) -> Orchestrator:
     Returns:
         Configured Orchestrator instance
     """
-    processor_repo = ProcessorRepository()
-    processor_repo.__init__(db_connection)
-
-    execution_repo = ExecutionRepository()
-    execution_repo.__init__(db_connection)
-
-    underwriting_repo = UnderwritingRepository()
-    underwriting_repo.__init__(db_connection)
+    processor_repo = ProcessorRepository(db_connection)
+    execution_repo = ExecutionRepository(db_connection)
+    underwriting_repo = UnderwritingRepository(db_connection)
 
     return Orchestrator(
         processor_repo=processor_repo,
@@ -5,11 +5,13 @@ A class-based registry that maps processor names to their class implementations.
 This provides a centralized way to register and retrieve processor classes.
 """
 
+import functools
 import importlib
 import inspect
 from pathlib import Path
 from typing import Type, Dict
 from ..base_processor import BaseProcessor
+from ..models import ProcessorType
 
 
 class Registry:
@@ -55,6 +57,7 @@ class Registry:
             )
 
         self._registry[processor_name] = processor_class
+        resolve_processor.cache_clear()
         print(f"✅ Registered processor: {processor_name}")
 
     def get_processor(self, processor_name: str) -> Type[BaseProcessor]:
@@ -98,15 +101,46 @@ class Registry:
     def clear_registry(self) -> None:
         """Clear all registered processors (mainly for testing)."""
         self._registry.clear()
+        resolve_processor.cache_clear()
 
 
+@functools.lru_cache(maxsize=1)
 def get_registry() -> Registry:
     """
     Returns the singleton instance of the Registry.
+
+    Cached, so repeated calls skip Registry.__new__/__init__ dispatch.
     """
     return Registry()
 
 
+@functools.lru_cache(maxsize=None)
+def resolve_processor(
+    processor_name: str,
+) -> tuple[Type[BaseProcessor], ProcessorType, dict[str, list[str]]]:
+    """
+    Resolve a registered processor's class, type and triggers in one call.
+
+    Memoized per processor name; the registry clears the cache whenever a
+    processor is registered or the registry is cleared.
+
+    Args:
+        processor_name: Name of the registered processor
+
+    Returns:
+        Tuple of (processor class, PROCESSOR_TYPE, PROCESSOR_TRIGGERS)
+
+    Raises:
+        ValueError: If processor is not registered
+    """
+    processor_class = get_registry().get_processor(processor_name)
+    return (
+        processor_class,
+        processor_class.PROCESSOR_TYPE,
+        processor_class.PROCESSOR_TRIGGERS,
+    )
+
+
 current_dir = Path(__file__).parent
 processors_dir = current_dir.parent / "processors"
 
@@ -0,0 +1,636 @@
+"""
+Integration tests for repository writes against PostgreSQL
+
+Runs the repositories' SQL against the real schema, where a mocked cursor
+cannot tell whether a statement is valid or what it returns.
+"""
+
+# pylint: disable=redefined-outer-name  # pytest fixtures
+
+import os
+import sys
+from pathlib import Path
+
+import psycopg2
+import pytest
+from dotenv import load_dotenv
+from psycopg2.extras import RealDictCursor
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from aura.processing_engine.exceptions import (  # pylint: disable=import-error,wrong-import-position
+    ConcurrentUpdateError,
+)
+from aura.processing_engine.repositories import (  # pylint: disable=import-error,wrong-import-position
+    ExecutionRepository,
+    FactorRepository,
+    ProcessorRepository,
+    UnderwritingRepository,
+    execution_repository,
+    test_workflow_repository,
+)
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Database connection type: postgresql or bigquery
+DATABASE_CONNECTION = os.getenv("DATABASE_CONNECTION", "postgresql")
+
+# PostgreSQL configuration
+POSTGRES_CONFIG = {
+    "host": os.getenv("POSTGRES_HOST", "localhost"),
+    "port": int(os.getenv("POSTGRES_PORT", "5432")),
+    "database": os.getenv("POSTGRES_DB", "aura_underwriting"),
+    "user": os.getenv("POSTGRES_USER", "aura_user"),
+    "password": os.getenv("POSTGRES_PASSWORD", "aura_password"),
+}
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(
+        DATABASE_CONNECTION != "postgresql",
+        reason="Requires DATABASE_CONNECTION=postgresql",
+    ),
+]
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+
+@pytest.fixture
+def db_connection():
+    """Database connection returning dict rows, as the services use."""
+    conn = psycopg2.connect(**POSTGRES_CONFIG, cursor_factory=RealDictCursor)
+    yield conn
+    conn.rollback()
+    conn.close()
+
+
+@pytest.fixture
+def seed_ids(db_connection):
+    """IDs of the seeded test organization and account."""
+    with db_connection.cursor() as cursor:
+        cursor.execute("SELECT id FROM organization WHERE name = 'Test Organization'")
+        org = cursor.fetchone()
+        cursor.execute("SELECT id FROM account WHERE email = 'test@example.com'")
+        account = cursor.fetchone()
+    db_connection.rollback()
+
+    if not org or not account:
+        pytest.skip("Seed data not loaded")
+    return {"organization_id": str(org["id"]), "account_id": str(account["id"])}
+
+
+def _create_underwriting(db_connection, seed_ids, serial_number):
+    """Insert an underwriting and return its ID."""
+    with db_connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO underwriting (
+                organization_id, serial_number, status, created_by, updated_by
+            ) VALUES (%s, %s, 'created', %s, %s)
+            RETURNING id
+            """,
+            (
+                seed_ids["organization_id"],
+                serial_number,
+                seed_ids["account_id"],
+                seed_ids["account_id"],
+            ),
+        )
+        underwriting_id = str(cursor.fetchone()["id"])
+    db_connection.commit()
+    return underwriting_id
+
+
+@pytest.fixture
+def underwriting_ids(db_connection, seed_ids):
+    """Two throwaway underwritings, deleted afterwards with everything under them."""
+    ids = [
+        _create_underwriting(db_connection, seed_ids, f"TEST-REPO-{suffix}")
+        for suffix in ("A", "B")
+    ]
+    yield ids
+
+    db_connection.rollback()
+    with db_connection.cursor() as cursor:
+        cursor.execute("DELETE FROM underwriting WHERE id = ANY(%s::uuid[])", (ids,))
+    db_connection.commit()
+
+
+@pytest.fixture
+def underwriting_repo(db_connection):
+    """UnderwritingRepository bound to the test connection."""
+    return UnderwritingRepository(db_connection)
+
+
+@pytest.fixture
+def processor_ids(db_connection, seed_ids, underwriting_ids):
+    """Three underwriting processors on the first underwriting."""
+    with db_connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO underwriting_processors (
+                organization_id, underwriting_id, processor, name
+            )
+            SELECT %s, %s, 'test_processor_' || n, 'Processor ' || n
+            FROM generate_series(1, 3) AS n
+            RETURNING id
+            """,
+            (seed_ids["organization_id"], underwriting_ids[0]),
+        )
+        ids = [str(row["id"]) for row in cursor.fetchall()]
+    db_connection.commit()
+    return ids
+
+
+@pytest.fixture
+def execution_repo(db_connection):
+    """ExecutionRepository bound to the test connection, outside the singleton."""
+    return ExecutionRepository.bound(db_connection)
+
+
+def _create_execution(execution_repo, seed_ids, underwriting_id, up_id, payload_hash):
+    """Create a pending execution and return its ID."""
+    return execution_repo.create_execution(
+        underwriting_id=underwriting_id,
+        underwriting_processor_id=up_id,
+        organization_id=seed_ids["organization_id"],
+        processor_name="test_application_processor",
+        payload={"hash": payload_hash},
+        payload_hash=payload_hash,
+    )
+
+
+def _owners(underwriting_repo, underwriting_id):
+    """All owners of an underwriting keyed by ID, disabled ones included."""
+    return {
+        str(owner["owner_id"]): owner
+        for owner in underwriting_repo.get_owners(underwriting_id, enabled_only=False)
+    }
+
+
+# =============================================================================
+# OWNER SAVES
+# =============================================================================
+
+
+class TestSaveOwnersList:
+    """save_owners_list against the owner table."""
+
+    def test_insert_update_and_soft_delete(
+        self, underwriting_repo, underwriting_ids, seed_ids
+    ):
+        """One save inserts new owners, updates kept ones and removes the rest."""
+        underwriting_id = underwriting_ids[0]
+        user_id = seed_ids["account_id"]
+        first = underwriting_repo.save_owners_list(
+            underwriting_id,
+            [{"first_name": "Ada"}, {"first_name": "Grace"}],
+            user_id,
+            user_id,
+        )
+        ada_id, grace_id = first["inserted"]
+
+        second = underwriting_repo.save_owners_list(
+            underwriting_id,
+            [{"owner_id": ada_id, "first_name": "Ada B."}, {"first_name": "Alan"}],
+            user_id,
+            user_id,
+        )
+
+        assert second["updated"] == [ada_id]
+        assert second["removed"] == [grace_id]
+        (alan_id,) = second["inserted"]
+
+        owners = _owners(underwriting_repo, underwriting_id)
+        assert owners[ada_id]["first_name"] == "Ada B."
+        assert owners[ada_id]["row_version"] == 1
+        assert owners[grace_id]["enabled"] is False
+        assert owners[alan_id]["enabled"] is True
+
+    def test_stale_row_version_raises_and_rolls_back(
+        self, underwriting_repo, underwriting_ids, seed_ids
+    ):
+        """A save at an outdated row_version changes nothing."""
+        underwriting_id = underwriting_ids[0]
+        user_id = seed_ids["account_id"]
+        (owner_id,) = underwriting_repo.save_owners_list(
+            underwriting_id, [{"first_name": "Ada"}], user_id, user_id
+        )["inserted"]
+
+        # Someone else saves the owner first, moving it to row_version 1
+        underwriting_repo.save_owners_list(
+            underwriting_id,
+            [{"owner_id": owner_id, "row_version": 0, "first_name": "Ada B."}],
+            user_id,
+            user_id,
+        )
+
+        with pytest.raises(ConcurrentUpdateError):
+            underwriting_repo.save_owners_list(
+                underwriting_id,
+                [
+                    {"owner_id": owner_id, "row_version": 0, "first_name": "Ada C."},
+                    {"first_name": "Alan"},
+                ],
+                user_id,
+                user_id,
+            )
+
+        owners = _owners(underwriting_repo, underwriting_id)
+        assert list(owners) == [owner_id]
+        assert owners[owner_id]["first_name"] == "Ada B."
+        assert owners[owner_id]["row_version"] == 1
+
+    def test_foreign_owner_id_is_saved_as_a_new_owner(
+        self, underwriting_repo, underwriting_ids, seed_ids
+    ):
+        """An id of another underwriting's owner never updates that owner."""
+        underwriting_id, other_underwriting_id = underwriting_ids
+        user_id = seed_ids["account_id"]
+        (foreign_id,) = underwriting_repo.save_owners_list(
+            other_underwriting_id, [{"first_name": "Ada"}], user_id, user_id
+        )["inserted"]
+
+        result = underwriting_repo.save_owners_list(
+            underwriting_id,
+            [{"owner_id": foreign_id, "first_name": "Mallory"}],
+            user_id,
+            user_id,
+        )
+
+        (new_id,) = result["inserted"]
+        assert new_id != foreign_id
+        assert result["updated"] == []
+        assert _owners(underwriting_repo, underwriting_id)[new_id]["first_name"] == (
+            "Mallory"
+        )
+        foreign = _owners(underwriting_repo, other_underwriting_id)[foreign_id]
+        assert foreign["first_name"] == "Ada"
+        assert foreign["row_version"] == 0
+
+        # Sent with a row_version, the same id is a conflict, not an insert
+        with pytest.raises(ConcurrentUpdateError):
+            underwriting_repo.save_owners_list(
+                underwriting_id,
+                [{"owner_id": foreign_id, "row_version": 0, "first_name": "M."}],
+                user_id,
+                user_id,
+            )
+
+    def test_disabled_owner_id_is_saved_as_a_new_owner(
+        self, underwriting_repo, underwriting_ids, seed_ids
+    ):
+        """A soft-deleted owner stays deleted when its id is sent again."""
+        underwriting_id = underwriting_ids[0]
+        user_id = seed_ids["account_id"]
+        (removed_id,) = underwriting_repo.save_owners_list(
+            underwriting_id, [{"first_name": "Ada"}], user_id, user_id
+        )["inserted"]
+        underwriting_repo.save_owners_list(underwriting_id, [], user_id, user_id)
+
+        result = underwriting_repo.save_owners_list(
+            underwriting_id,
+            [{"owner_id": removed_id, "first_name": "Ada again"}],
+            user_id,
+            user_id,
+        )
+
+        (new_id,) = result["inserted"]
+        assert new_id != removed_id
+        owners = _owners(underwriting_repo, underwriting_id)
+        assert owners[removed_id]["enabled"] is False
+        assert owners[removed_id]["first_name"] == "Ada"
+        assert owners[new_id]["first_name"] == "Ada again"
+
+    def test_empty_list_soft_deletes_every_owner(
+        self, underwriting_repo, underwriting_ids, seed_ids
+    ):
+        """An empty list removes every enabled owner and only those."""
+        underwriting_id, other_underwriting_id = underwriting_ids
+        user_id = seed_ids["account_id"]
+        inserted = underwriting_repo.save_owners_list(
+            underwriting_id,
+            [{"first_name": "Ada"}, {"first_name": "Grace"}],
+            user_id,
+            user_id,
+        )["inserted"]
+        underwriting_repo.save_owners_list(
+            other_underwriting_id, [{"first_name": "Alan"}], user_id, user_id
+        )
+
+        result = underwriting_repo.save_owners_list(
+            underwriting_id, [], user_id, user_id
+        )
+
+        assert sorted(result["removed"]) == sorted(inserted)
+        assert result["inserted"] == [] and result["updated"] == []
+        assert underwriting_repo.get_owners(underwriting_id) == []
+        assert len(underwriting_repo.get_owners(other_underwriting_id)) == 1
+
+        # Nothing left to remove
+        again = underwriting_repo.save_owners_list(
+            underwriting_id, [], user_id, user_id
+        )
+        assert again["removed"] == []
+
+
+# =============================================================================
+# FACTOR SAVES
+# =============================================================================
+
+
+class TestSaveFactorsBulk:
+    """save_factors_bulk against the factor table."""
+
+    @pytest.fixture
+    def factor_repo(self, db_connection):
+        """FactorRepository bound to the test connection."""
+        return FactorRepository(db_connection)
+
+    @pytest.fixture
+    def saves(self, execution_repo, seed_ids, underwriting_ids, processor_ids):
+        """Build save_factors_bulk entries, one execution per processor."""
+        underwriting_id = underwriting_ids[0]
+        execution_ids = {
+            up_id: _create_execution(
+                execution_repo, seed_ids, underwriting_id, up_id, f"hash-{up_id}"
+            )
+            for up_id in processor_ids
+        }
+
+        def build(factors_by_processor):
+            return [
+                {
+                    "organization_id": seed_ids["organization_id"],
+                    "underwriting_id": underwriting_id,
+                    "underwriting_processor_id": up_id,
+                    "execution_id": execution_ids[up_id],
+                    "factors": factors,
+                }
+                for up_id, factors in factors_by_processor.items()
+            ]
+
+        return build
+
+    @staticmethod
+    def _values(factor_repo, underwriting_id, up_id):
+        factors = factor_repo.get_factors(underwriting_id, up_id)
+        values = {factor["factor_key"]: factor["value"] for factor in factors}
+        # One active row per key: updates never add a second row
+        assert len(values) == len(factors)
+        return values
+
+    def test_changed_unchanged_and_new_keys(
+        self, factor_repo, saves, underwriting_ids, processor_ids
+    ):
+        """Only processors with a changed or new factor are reported."""
+        underwriting_id = underwriting_ids[0]
+        changed_up, new_up, unchanged_up = processor_ids
+
+        first = factor_repo.save_factors_bulk(
+            saves(
+                {
+                    changed_up: {"f_revenue": 100, "f_nsf": 2},
+                    unchanged_up: {"f_score": {"value": 7, "band": "B"}},
+                }
+            )
+        )
+        assert first == {changed_up, unchanged_up}
+
+        second = factor_repo.save_factors_bulk(
+            saves(
+                {
+                    # f_revenue unchanged, f_nsf changed, f_months new
+                    changed_up: {"f_revenue": 100, "f_nsf": 3, "f_months": 12},
+                    new_up: {"f_industry": "retail", "f_skipped": None},
+                    unchanged_up: {"f_score": {"band": "B", "value": 7}},
+                }
+            )
+        )
+
+        assert second == {changed_up, new_up}
+        assert self._values(factor_repo, underwriting_id, changed_up) == {
+            "f_revenue": 100,
+            "f_nsf": 3,
+            "f_months": 12,
+        }
+        assert self._values(factor_repo, underwriting_id, new_up) == {
+            "f_industry": "retail"
+        }
+        assert self._values(factor_repo, underwriting_id, unchanged_up) == {
+            "f_score": {"value": 7, "band": "B"}
+        }
+
+    def test_nothing_to_save(self, factor_repo, saves, processor_ids):
+        """No entries, or only None values, write nothing."""
+        assert factor_repo.save_factors_bulk([]) == set()
+        assert factor_repo.save_factors_bulk(
+            saves({processor_ids[0]: {"f": None}})
+        ) == (set())
+
+    def test_failure_rolls_back_every_entry(
+        self, factor_repo, saves, underwriting_ids, processor_ids
+    ):
+        """One bad entry raises and leaves no factor of the batch behind."""
+        batch = saves({processor_ids[0]: {"f_revenue": 100}})
+        bad = dict(batch[0], underwriting_processor_id=processor_ids[1])
+        bad["execution_id"] = "00000000-0000-4000-8000-000000000000"
+        bad["factors"] = {"f_nsf": 1}
+
+        with pytest.raises(psycopg2.errors.ForeignKeyViolation):
+            factor_repo.save_factors_bulk([*batch, bad])
+
+        assert factor_repo.get_factors(underwriting_ids[0]) == []
+
+
+# =============================================================================
+# EXECUTION DEDUPLICATION
+# =============================================================================
+
+
+class TestFindExecutionIdsByHashes:
+    """find_execution_ids_by_hashes and its hit-only cache."""
+
+    def test_latest_execution_per_hash(
+        self, execution_repo, seed_ids, underwriting_ids, processor_ids
+    ):
+        """Each hash resolves to its newest execution; unknown hashes are absent."""
+        underwriting_id, up_id = underwriting_ids[0], processor_ids[0]
+        _create_execution(execution_repo, seed_ids, underwriting_id, up_id, "h1")
+        newest_h1 = _create_execution(
+            execution_repo, seed_ids, underwriting_id, up_id, "h1"
+        )
+        h2 = _create_execution(execution_repo, seed_ids, underwriting_id, up_id, "h2")
+        # Same hash under another processor is not a match
+        _create_execution(
+            execution_repo, seed_ids, underwriting_id, processor_ids[1], "h3"
+        )
+
+        found = execution_repo.find_execution_ids_by_hashes(
+            up_id, ["h1", "h2", "h3", "h1"]
+        )
+
+        assert found == {"h1": newest_h1, "h2": h2}
+        assert execution_repo.find_execution_id_by_hash(up_id, "h2") == h2
+        assert execution_repo.find_execution_ids_by_hashes(up_id, []) == {}
+
+    def test_misses_are_not_cached(
+        self, execution_repo, seed_ids, underwriting_ids, processor_ids
+    ):
+        """An execution created after a miss is found by the next lookup."""
+        underwriting_id, up_id = underwriting_ids[0], processor_ids[0]
+        assert execution_repo.find_execution_id_by_hash(up_id, "late") is None
+
+        # Inserted directly, as another process would, bypassing any
+        # invalidation create_execution does in this one
+        with execution_repo.db.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO processor_executions (
+                    organization_id, underwriting_id, underwriting_processor_id,
+                    processor, status, payload_hash
+                ) VALUES (%s, %s, %s, 'test_application_processor', 'pending', 'late')
+                RETURNING id
+                """,
+                (seed_ids["organization_id"], underwriting_id, up_id),
+            )
+            late_id = str(cursor.fetchone()["id"])
+        execution_repo.db.commit()
+
+        assert execution_repo.find_execution_id_by_hash(up_id, "late") == late_id
+
+    def test_status_changes_and_deactivation_invalidate(
+        self, execution_repo, seed_ids, underwriting_ids, processor_ids
+    ):
+        """Updating or deactivating an execution drops its cached lookup."""
+        underwriting_id, up_id = underwriting_ids[0], processor_ids[0]
+        first = _create_execution(execution_repo, seed_ids, underwriting_id, up_id, "a")
+        second = _create_execution(
+            execution_repo, seed_ids, underwriting_id, up_id, "b"
+        )
+        execution_repo.find_execution_ids_by_hashes(up_id, ["a", "b"])
+        cache = execution_repository._EXECUTION_HASH_CACHE
+        assert cache[(up_id, "a")] == first and cache[(up_id, "b")] == second
+
+        execution_repo.update_execution_status(first, "running")
+        assert (up_id, "a") not in cache
+        assert (up_id, "b") in cache
+
+        execution_repo.deactivate_executions([second])
+        assert (up_id, "b") not in cache
+
+
+# =============================================================================
+# PREPARED STATEMENTS
+# =============================================================================
+
+
+class TestPreparedStatementReset:
+    """Lookups after the session's prepared statements were deallocated."""
+
+    @pytest.fixture
+    def processor_repo(self, db_connection):
+        """ProcessorRepository bound to the test connection."""
+        return ProcessorRepository.bound(db_connection)
+
+    @staticmethod
+    def _deallocate_all(db_connection):
+        """Drop every prepared statement, as a server-side session reset would."""
+        with db_connection.cursor() as cursor:
+            cursor.execute("DEALLOCATE ALL")
+
+    def test_lookup_is_reprepared_outside_a_transaction(
+        self, db_connection, processor_repo, underwriting_ids, processor_ids
+    ):
+        """With no transaction open the lookup re-prepares and succeeds."""
+        assert len(processor_repo.get_underwriting_processors(underwriting_ids[0])) == 3
+        db_connection.rollback()
+        self._deallocate_all(db_connection)
+        db_connection.commit()
+
+        processors = processor_repo.get_underwriting_processors(underwriting_ids[0])
+
+        assert {str(row["id"]) for row in processors} == set(processor_ids)
+
+    def test_lookup_in_a_transaction_raises_then_recovers(
+        self, db_connection, processor_repo, underwriting_ids, processor_ids
+    ):
+        """Inside a transaction the error is raised; after rollback it works."""
+        assert len(processor_repo.get_underwriting_processors(underwriting_ids[0])) == 3
+        self._deallocate_all(db_connection)
+
+        with pytest.raises(psycopg2.errors.InvalidSqlStatementName):
+            processor_repo.get_underwriting_processors(underwriting_ids[0])
+        db_connection.rollback()
+
+        processors = processor_repo.get_underwriting_processors(underwriting_ids[0])
+
+        assert {str(row["id"]) for row in processors} == set(processor_ids)
+
+
+# =============================================================================
+# TEST WORKFLOW LOGGING
+# =============================================================================
+
+
+class TestLogStagesBulk:
+    """TestWorkflowRepository.log_stages_bulk against test_workflow."""
+
+    @pytest.fixture
+    def workflow_repo(self, db_connection, underwriting_ids):
+        """TestWorkflowRepository bound to the test connection."""
+        with db_connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('test_workflow') AS name")
+            exists = cursor.fetchone()["name"] is not None
+        db_connection.rollback()
+        if not exists:
+            pytest.skip("test_workflow table not created")
+
+        repo = test_workflow_repository.TestWorkflowRepository(db_connection)
+        yield repo
+        repo.clear_test_data(underwriting_ids[0])
+
+    def test_records_are_written_in_order(self, workflow_repo, underwriting_ids):
+        """Every record is stored, and IDs come back in input order."""
+        underwriting_id = underwriting_ids[0]
+        records = [
+            {
+                "underwriting_id": underwriting_id,
+                "workflow_name": "Workflow 1",
+                "stage": stage,
+                "payload": {"stage": stage, "n": n},
+                "output": {"ok": True} if stage == "execution" else None,
+                "status": "failed" if stage == "consolidation" else "completed",
+                "error_message": "boom" if stage == "consolidation" else None,
+                "execution_time_ms": n,
+            }
+            for n, stage in enumerate(("filtration", "execution", "consolidation"))
+        ]
+
+        ids = workflow_repo.log_stages_bulk(records)
+
+        stages = {
+            str(stage["id"]): stage
+            for stage in workflow_repo.get_workflow_stages(underwriting_id)
+        }
+        assert len(ids) == 3 and set(ids) == set(stages)
+        assert [stages[record_id]["stage"] for record_id in ids] == [
+            "filtration",
+            "execution",
+            "consolidation",
+        ]
+        execution = stages[ids[1]]
+        assert execution["payload"] == {"stage": "execution", "n": 1}
+        assert execution["output"] == {"ok": True}
+        assert stages[ids[2]]["status"] == "failed"
+        assert stages[ids[2]]["error_message"] == "boom"
+        assert execution["payload_hash"] != stages[ids[0]]["payload_hash"]
+
+    def test_empty_records(self, workflow_repo):
+        """No records means no statement and no IDs."""
+        assert workflow_repo.log_stages_bulk([]) == []
@@ -0,0 +1,156 @@
+"""
+Tests for the Consolidation Service
+
+Covers how consolidation() stages factor saves for the whole processor list
+and writes them with one save_factors_bulk call, including the failure path
+where that single write fails for every staged processor.
+"""
+
+# pylint: disable=redefined-outer-name  # pytest fixtures
+
+import importlib
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest  # pylint: disable=import-error
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent / "src"))
+
+# The services package re-exports consolidation() under the module's name
+consolidation_module = importlib.import_module(
+    "aura.processing_engine.services.consolidation"
+)
+
+UP_WITH_FACTORS = "up-1"
+UP_OTHER = "up-2"
+UP_NO_FACTORS = "up-3"
+
+
+class FirstExecutionProcessor:
+    """Processor class stand-in using the default consolidation rule."""
+
+    @staticmethod
+    def consolidate(factors_list):
+        return factors_list[0]
+
+
+def _config(underwriting_processor_id):
+    return {
+        "id": underwriting_processor_id,
+        "processor": "test_processor",
+        "organization_id": "org-1",
+        "underwriting_id": "uw-1",
+    }
+
+
+@pytest.fixture
+def repos():
+    """Repositories consolidation() binds to its pooled connection."""
+    processor_repo = Mock()
+    processor_repo.get_underwriting_processors_by_ids.return_value = {
+        up_id: _config(up_id) for up_id in (UP_WITH_FACTORS, UP_OTHER, UP_NO_FACTORS)
+    }
+    execution_repo = Mock()
+    execution_repo.get_active_executions_for_processors.return_value = {
+        UP_WITH_FACTORS: [
+            {"id": "ex-1", "factors_delta": {"factors": {"f_revenue": 100}}}
+        ],
+        UP_OTHER: [{"id": "ex-2", "factors_delta": {"factors": {"f_nsf": 2}}}],
+        UP_NO_FACTORS: [{"id": "ex-3", "factors_delta": None}],
+    }
+    factor_repo = Mock()
+    factor_repo.save_factors_bulk.return_value = {UP_WITH_FACTORS, UP_OTHER}
+    return processor_repo, execution_repo, factor_repo
+
+
+@pytest.fixture
+def run_consolidation(repos):
+    """Call consolidation() with the database and registry replaced."""
+    processor_repo, execution_repo, factor_repo = repos
+
+    @contextmanager
+    def pooled_connection():
+        yield Mock()
+
+    registry = Mock()
+    registry.is_processor_registered.return_value = True
+    registry.get_processor.return_value = FirstExecutionProcessor
+
+    with patch.object(
+        consolidation_module, "pooled_connection", pooled_connection
+    ), patch.object(
+        consolidation_module.ProcessorRepository, "bound", return_value=processor_repo
+    ), patch.object(
+        consolidation_module.ExecutionRepository, "bound", return_value=execution_repo
+    ), patch.object(
+        consolidation_module, "FactorRepository", return_value=factor_repo
+    ), patch.object(
+        consolidation_module, "get_registry", return_value=registry
+    ):
+        yield consolidation_module.consolidation
+
+
+class TestConsolidation:
+    """consolidation() staging and the single batched factor write."""
+
+    def test_factors_are_saved_in_one_bulk_call(self, run_consolidation, repos):
+        """Every processor with factors is staged into one save_factors_bulk call."""
+        _, _, factor_repo = repos
+
+        result = run_consolidation([UP_WITH_FACTORS, UP_OTHER, UP_NO_FACTORS])
+
+        factor_repo.save_factors_bulk.assert_called_once()
+        (saves,) = factor_repo.save_factors_bulk.call_args.args
+        assert saves == [
+            {
+                "organization_id": "org-1",
+                "underwriting_id": "uw-1",
+                "underwriting_processor_id": UP_WITH_FACTORS,
+                "execution_id": "ex-1",
+                "factors": {"f_revenue": 100},
+                "source": "processor",
+            },
+            {
+                "organization_id": "org-1",
+                "underwriting_id": "uw-1",
+                "underwriting_processor_id": UP_OTHER,
+                "execution_id": "ex-2",
+                "factors": {"f_nsf": 2},
+                "source": "processor",
+            },
+        ]
+        assert result["consolidated"] == 3
+        assert all(entry["success"] for entry in result["results"])
+
+    def test_bulk_save_failure_fails_every_staged_result(
+        self, run_consolidation, repos
+    ):
+        """A failed bulk write marks each staged processor failed, and only those."""
+        _, _, factor_repo = repos
+        factor_repo.save_factors_bulk.side_effect = RuntimeError("connection lost")
+
+        result = run_consolidation([UP_WITH_FACTORS, UP_OTHER, UP_NO_FACTORS])
+
+        by_id = {
+            entry["underwriting_processor_id"]: entry for entry in result["results"]
+        }
+        for underwriting_processor_id in (UP_WITH_FACTORS, UP_OTHER):
+            assert by_id[underwriting_processor_id]["success"] is False
+            assert by_id[underwriting_processor_id]["error"] == "connection lost"
+
+        # Nothing was staged for it, so the failed write does not touch it
+        assert by_id[UP_NO_FACTORS]["success"] is True
+        assert by_id[UP_NO_FACTORS]["factors"] == {}
+        assert result["consolidated"] == 1
+
+    def test_nothing_staged_skips_the_write(self, run_consolidation, repos):
+        """No factors anywhere means no save_factors_bulk call."""
+        _, _, factor_repo = repos
+
+        result = run_consolidation([UP_NO_FACTORS])
+
+        factor_repo.save_factors_bulk.assert_not_called()
+        assert result["consolidated"] == 1
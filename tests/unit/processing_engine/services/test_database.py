@@ -0,0 +1,79 @@
+"""
+Tests for the shared service connection pool
+
+Covers pooled_connection() queueing callers once every connection is checked
+out, instead of letting getconn() raise PoolError.
+"""
+
+# pylint: disable=redefined-outer-name  # pytest fixtures
+
+import importlib
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest  # pylint: disable=import-error
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent / "src"))
+
+database_module = importlib.import_module("aura.processing_engine.services.database")
+
+
+@pytest.fixture
+def pool():
+    """A one-connection pool standing in for the shared ThreadedConnectionPool."""
+    pool = Mock()
+    pool.getconn.side_effect = Mock
+    with patch.object(database_module, "get_pool", return_value=pool), patch.object(
+        database_module, "_checkout_slots", threading.BoundedSemaphore(1)
+    ):
+        yield pool
+
+
+class TestPooledConnection:
+    """pooled_connection() checkout and return."""
+
+    def test_connection_is_returned_to_the_pool(self, pool):
+        """The borrowed connection goes back even when the block raises."""
+        with pytest.raises(RuntimeError):
+            with database_module.pooled_connection() as connection:
+                raise RuntimeError("boom")
+
+        pool.putconn.assert_called_once_with(connection)
+
+    def test_waits_for_a_free_connection(self, pool):
+        """A caller beyond the pool size blocks until a connection is returned."""
+        checked_out = threading.Event()
+        release = threading.Event()
+
+        def hold_connection():
+            with database_module.pooled_connection():
+                checked_out.set()
+                release.wait(5)
+
+        holder = threading.Thread(target=hold_connection)
+        holder.start()
+        checked_out.wait(5)
+
+        waiter_done = threading.Event()
+
+        def wait_for_connection():
+            with database_module.pooled_connection():
+                waiter_done.set()
+
+        waiter = threading.Thread(target=wait_for_connection)
+        waiter.start()
+
+        # The second checkout is queued, not rejected
+        assert not waiter_done.wait(0.1)
+        assert pool.getconn.call_count == 1
+
+        release.set()
+        holder.join(5)
+        waiter.join(5)
+
+        assert waiter_done.is_set()
+        assert pool.getconn.call_count == 2
+        assert pool.putconn.call_count == 2
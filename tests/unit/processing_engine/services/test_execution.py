@@ -0,0 +1,90 @@
+"""
+Tests for the Execution Service
+
+Covers how each execution worker borrows its pooled connection, and the
+failure path where no connection can be obtained.
+"""
+
+# pylint: disable=redefined-outer-name,protected-access  # pytest fixtures, test access
+
+import importlib
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest  # pylint: disable=import-error
+from psycopg2 import OperationalError  # pylint: disable=import-error
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent / "src"))
+
+# The services package re-exports execution() under the module's name
+execution_module = importlib.import_module("aura.processing_engine.services.execution")
+
+EXECUTION = {
+    "id": "ex-1",
+    "processor": "test_processor",
+    "underwriting_processor_id": "up-1",
+    "underwriting_id": "uw-1",
+    "payload": {},
+}
+
+
+@pytest.fixture
+def shared_execution_repo():
+    """The process-wide ExecutionRepository singleton."""
+    repo = Mock()
+    with patch.object(execution_module, "ExecutionRepository") as repository_class:
+        repository_class.return_value = repo
+        repository_class.bound.return_value = Mock()
+        yield repo
+
+
+class TestRunPooledExecution:
+    """_run_pooled_execution() connection handling."""
+
+    def test_runs_on_bound_repositories(self, shared_execution_repo):
+        """The execution runs on repositories bound to its own connection."""
+        connection = Mock()
+
+        @contextmanager
+        def pooled_connection():
+            yield connection
+
+        with patch.object(
+            execution_module, "pooled_connection", pooled_connection
+        ), patch.object(
+            execution_module, "run_execution", return_value={"success": True}
+        ) as run_execution:
+            result = execution_module._run_pooled_execution(EXECUTION)
+
+        assert result == {"success": True}
+        execution_module.ExecutionRepository.bound.assert_called_once_with(connection)
+        assert (
+            run_execution.call_args.kwargs["execution_repo"]
+            is execution_module.ExecutionRepository.bound.return_value
+        )
+        shared_execution_repo.update_execution_status.assert_not_called()
+
+    def test_no_connection_marks_the_execution_failed(self, shared_execution_repo):
+        """A failed checkout fails the row instead of leaving it 'pending'."""
+
+        @contextmanager
+        def pooled_connection():
+            raise OperationalError("could not connect to server")
+            yield  # pylint: disable=unreachable
+
+        with patch.object(
+            execution_module, "pooled_connection", pooled_connection
+        ), patch.object(execution_module, "run_execution") as run_execution:
+            result = execution_module._run_pooled_execution(EXECUTION)
+
+        run_execution.assert_not_called()
+        call = shared_execution_repo.update_execution_status.call_args
+        assert call.kwargs["execution_id"] == "ex-1"
+        assert call.kwargs["status"] == "failed"
+        assert "could not connect to server" in call.kwargs["failed_reason"]
+        assert result["success"] is False
+        assert result["execution_id"] == "ex-1"
+        assert result["error"] == "could not connect to server"
@@ -0,0 +1,61 @@
+"""
+Tests for the bound() constructors of the singleton repositories
+
+bound() builds a repository on a borrowed connection without touching the
+process-wide singleton, and initializes it through __init__ like any other
+instance.
+"""
+
+# pylint: disable=protected-access  # test access
+
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest  # pylint: disable=import-error
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from aura.processing_engine.repositories import (  # pylint: disable=import-error,wrong-import-position
+    ExecutionRepository,
+    ProcessorRepository,
+)
+
+
+@pytest.mark.parametrize("repository_class", [ExecutionRepository, ProcessorRepository])
+class TestBound:
+    """bound() instances are initialized normally and stay off the singleton."""
+
+    def test_bound_instance_uses_the_given_connection(self, repository_class):
+        """db and _db_connection are set by __init__ on the instance."""
+        connection = Mock()
+
+        repository = repository_class.bound(connection)
+
+        assert repository.db is connection
+        assert repository._db_connection is connection
+        assert repository is not repository_class()
+
+    def test_singleton_is_left_untouched(self, repository_class):
+        """Binding a connection does not rebind the shared instance."""
+        shared = repository_class()
+        shared_connection = shared.db
+
+        repository_class.bound(Mock())
+
+        assert repository_class() is shared
+        assert shared.db is shared_connection
+        assert repository_class._db_connection is None
+
+    def test_bound_runs_init(self, repository_class, monkeypatch):
+        """Attributes set in __init__ exist on bound instances too."""
+        original_init = repository_class.__init__
+
+        def init(self, db_connection=None):
+            original_init(self, db_connection)
+            self.extra = "set by __init__"
+
+        monkeypatch.setattr(repository_class, "__init__", init)
+
+        assert repository_class.bound(Mock()).extra == "set by __init__"
@@ -0,0 +1,272 @@
+"""
+Tests for UnderwritingRepository owner saves
+
+Pins the single-statement owner upsert: the prepared statement text, the
+parameter arrays bound to it, and how its RETURNING rows become the
+inserted/updated/removed result, the row_version conflict and the retry
+insert for ids the upsert could not claim.
+"""
+
+# pylint: disable=redefined-outer-name,protected-access  # pytest fixtures, test access
+
+import re
+import sys
+import uuid
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest  # pylint: disable=import-error
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from aura.processing_engine.exceptions import (  # pylint: disable=import-error,wrong-import-position
+    ConcurrentUpdateError,
+)
+from aura.processing_engine.repositories import (  # pylint: disable=import-error,wrong-import-position
+    underwriting_repository,
+)
+from aura.processing_engine.repositories.underwriting_repository import (  # pylint: disable=import-error,wrong-import-position
+    UnderwritingRepository,
+    _OWNER_ARRAY_COLUMNS,
+    _OWNER_INSERT_PARAM_TYPES,
+    _OWNER_INSERT_SQL,
+    _OWNER_SAVE_PARAM_TYPES,
+    _OWNER_SAVE_SQL,
+    _OWNER_SOFT_DELETE_ALL_SQL,
+)
+
+UNDERWRITING_ID = "11111111-1111-4111-8111-111111111111"
+USER_ID = "22222222-2222-4222-8222-222222222222"
+OWNER_A = "33333333-3333-4333-8333-333333333333"
+OWNER_B = "44444444-4444-4444-8444-444444444444"
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+
+@pytest.fixture
+def repo():
+    """UnderwritingRepository; _save_owners_list only uses the given cursor."""
+    return UnderwritingRepository()
+
+
+@pytest.fixture
+def cursor():
+    """Cursor whose fetchall results are set per test."""
+    return Mock()
+
+
+@pytest.fixture
+def execute_prepared():
+    """Record _execute_prepared calls instead of touching a database."""
+    with patch.object(underwriting_repository, "_execute_prepared") as mock:
+        yield mock
+
+
+def _owner(owner_id=None, **fields):
+    """Owner dict as a processor would send it."""
+    return {
+        "owner_id": owner_id,
+        "first_name": "Ada",
+        "last_name": "Lovelace",
+        **fields,
+    }
+
+
+def _placeholders(sql):
+    """Distinct $n placeholder numbers used by a statement."""
+    return {int(n) for n in re.findall(r"\$(\d+)", sql)}
+
+
+# =============================================================================
+# STATEMENT TEXT
+# =============================================================================
+
+
+class TestOwnerSaveStatement:
+    """The prepared statement and its declared parameter types agree."""
+
+    def test_save_sql_binds_every_declared_parameter(self):
+        """$1..$n in the save statement match _OWNER_SAVE_PARAM_TYPES."""
+        assert _placeholders(_OWNER_SAVE_SQL) == set(
+            range(1, len(_OWNER_SAVE_PARAM_TYPES) + 1)
+        )
+
+    def test_insert_sql_binds_every_declared_parameter(self):
+        """$1..$n in the retry insert match _OWNER_INSERT_PARAM_TYPES."""
+        assert _placeholders(_OWNER_INSERT_SQL) == set(
+            range(1, len(_OWNER_INSERT_PARAM_TYPES) + 1)
+        )
+
+    def test_save_param_types(self):
+        """Expected versions, then underwriting/users, then one array per column."""
+        assert _OWNER_SAVE_PARAM_TYPES == (
+            "uuid[]",
+            "int[]",
+            "uuid",
+            "uuid",
+            "uuid",
+            *(f"{sql_type}[]" for _, sql_type in _OWNER_ARRAY_COLUMNS),
+        )
+
+    def test_save_sql_guards_the_upsert(self):
+        """Only enabled owners of this underwriting at the expected version update."""
+        sql = _OWNER_SAVE_SQL
+        assert "ON CONFLICT (id) DO UPDATE" in sql
+        assert "WHERE owner.underwriting_id = EXCLUDED.underwriting_id" in sql
+        assert "AND owner.enabled = true" in sql
+        assert "AND owner.row_version = COALESCE(" in sql
+        assert "CASE WHEN xmax = 0 THEN 'inserted' ELSE 'updated' END" in sql
+
+    def test_soft_delete_excludes_input_ids(self):
+        """Owners in the input are never soft deleted by the same statement."""
+        assert "AND id <> ALL($6::uuid[])" in _OWNER_SAVE_SQL
+
+
+# =============================================================================
+# PARAMETERS AND RESULTS
+# =============================================================================
+
+
+class TestSaveOwnersList:
+    """_save_owners_list parameter arrays and result handling."""
+
+    def test_new_owners_get_generated_ids(self, repo, cursor, execute_prepared):
+        """Owners without an id are inserted under fresh UUIDs."""
+
+        def returning(*args, **kwargs):
+            ids = args[3][5]
+            cursor.fetchall.return_value = [
+                {"id": owner_id, "operation": "inserted"} for owner_id in ids
+            ]
+
+        execute_prepared.side_effect = returning
+
+        result = repo._save_owners_list(
+            cursor,
+            UNDERWRITING_ID,
+            [_owner(email="ada@example.com"), _owner("not-a-uuid")],
+            USER_ID,
+            USER_ID,
+        )
+
+        execute_prepared.assert_called_once()
+        _, name, sql, params, param_types = execute_prepared.call_args.args
+        assert name == "underwriting_save_owners"
+        assert sql is _OWNER_SAVE_SQL
+        assert param_types is _OWNER_SAVE_PARAM_TYPES
+        assert params[:5] == ([], [], UNDERWRITING_ID, USER_ID, USER_ID)
+        assert len(params) == len(_OWNER_SAVE_PARAM_TYPES)
+
+        ids = params[5]
+        assert len(ids) == 2
+        assert all(uuid.UUID(owner_id).version == 4 for owner_id in ids)
+        assert params[6] == ["Ada", "Ada"]
+        assert params[8] == ["ada@example.com", None]
+        assert params[14] == [False, False]
+        assert result == {"inserted": ids, "updated": [], "removed": []}
+
+    def test_versioned_and_unversioned_existing_owners(
+        self, repo, cursor, execute_prepared
+    ):
+        """Only owners sent with a row_version are put in the expected arrays."""
+        cursor.fetchall.return_value = [
+            {"id": OWNER_A, "operation": "updated"},
+            {"id": OWNER_B, "operation": "updated"},
+            {"id": "55555555-5555-4555-8555-555555555555", "operation": "removed"},
+        ]
+
+        result = repo._save_owners_list(
+            cursor,
+            UNDERWRITING_ID,
+            [_owner(OWNER_A, row_version=3), _owner(OWNER_B.upper())],
+            USER_ID,
+            USER_ID,
+        )
+
+        params = execute_prepared.call_args.args[3]
+        assert params[0] == [OWNER_A]
+        assert params[1] == [3]
+        # ids are normalised to canonical lowercase form
+        assert params[5] == [OWNER_A, OWNER_B]
+        assert result == {
+            "inserted": [],
+            "updated": [OWNER_A, OWNER_B],
+            "removed": ["55555555-5555-4555-8555-555555555555"],
+        }
+
+    def test_last_occurrence_of_an_id_wins(self, repo, cursor, execute_prepared):
+        """A repeated id is sent once, with the later fields and version."""
+        cursor.fetchall.return_value = [{"id": OWNER_A, "operation": "updated"}]
+
+        repo._save_owners_list(
+            cursor,
+            UNDERWRITING_ID,
+            [_owner(OWNER_A, row_version=1), _owner(OWNER_A, first_name="Grace")],
+            USER_ID,
+            USER_ID,
+        )
+
+        params = execute_prepared.call_args.args[3]
+        assert params[0] == [] and params[1] == []
+        assert params[5] == [OWNER_A]
+        assert params[6] == ["Grace"]
+
+    def test_stale_row_version_raises(self, repo, cursor, execute_prepared):
+        """A versioned owner missing from RETURNING is a concurrent update."""
+        cursor.fetchall.return_value = [{"id": OWNER_B, "operation": "updated"}]
+
+        with pytest.raises(ConcurrentUpdateError, match=OWNER_A):
+            repo._save_owners_list(
+                cursor,
+                UNDERWRITING_ID,
+                [_owner(OWNER_A, row_version=2), _owner(OWNER_B)],
+                USER_ID,
+                USER_ID,
+            )
+
+        # Nothing is retried once the save is known to be stale
+        assert execute_prepared.call_count == 1
+
+    def test_unclaimed_unversioned_id_is_inserted_as_new(
+        self, repo, cursor, execute_prepared
+    ):
+        """An id belonging to a disabled or foreign owner is saved under a new id."""
+        cursor.fetchall.return_value = [{"id": OWNER_B, "operation": "updated"}]
+
+        result = repo._save_owners_list(
+            cursor,
+            UNDERWRITING_ID,
+            [_owner(OWNER_A, email="a@example.com"), _owner(OWNER_B)],
+            USER_ID,
+            USER_ID,
+        )
+
+        assert execute_prepared.call_count == 2
+        _, name, sql, params, param_types = execute_prepared.call_args.args
+        assert name == "underwriting_insert_owners"
+        assert sql is _OWNER_INSERT_SQL
+        assert param_types is _OWNER_INSERT_PARAM_TYPES
+        assert params[:3] == (UNDERWRITING_ID, USER_ID, USER_ID)
+
+        (new_id,) = params[3]
+        assert new_id not in (OWNER_A, OWNER_B)
+        assert params[6] == ["a@example.com"]
+        assert result == {"inserted": [new_id], "updated": [OWNER_B], "removed": []}
+
+    def test_empty_list_soft_deletes_every_owner(self, repo, cursor, execute_prepared):
+        """An empty owners list runs only the soft delete of enabled owners."""
+        cursor.fetchall.return_value = [{"id": OWNER_A}, {"id": OWNER_B}]
+
+        result = repo._save_owners_list(cursor, UNDERWRITING_ID, [], USER_ID, USER_ID)
+
+        execute_prepared.assert_called_once_with(
+            cursor,
+            "underwriting_soft_delete_owners",
+            _OWNER_SOFT_DELETE_ALL_SQL,
+            (USER_ID, UNDERWRITING_ID),
+        )
+        assert result == {"inserted": [], "updated": [], "removed": [OWNER_A, OWNER_B]}